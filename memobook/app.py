@@ -5,6 +5,10 @@ from snoop import snoop, pp  # noqa: F401, I001
 
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from enum import Enum
 from gettext import gettext as _
 from pathlib import Path
@@ -13,17 +17,29 @@ import wx
 import wx.html2
 
 from bookmark_dialog import BookmarkDialog
+from catalog import CatalogView
 from editor_window import EditorDialog
 from memobook import DEFAULT_MEMOBOOK_SETTINGS, MemoBook
-from ObjectListView2 import ColumnDefn, FastObjectListView
+from ObjectListView2 import EVT_SORT, ColumnDefn, FastObjectListView
+from templates import memo_template
 from utils import Settings, get_domain_name_from_url, validate_url
 
 MEMOBOOKS_DIR_NAME = "memobooks"
 DEFAULT_MEMOBOOK_NAME = _("My Memos")  # TRANSLATORS: This is the name of the default memobook.
-DEFAULT_APP_SETTINGS = {"memobooks_dir": MEMOBOOKS_DIR_NAME, "last_opened_memobook": None, "memobooks": []}
-
-MIN_CHARS_TO_SEARCH = 5
+DEFAULT_APP_SETTINGS = {
+    "memobooks_dir": MEMOBOOKS_DIR_NAME,
+    "last_opened_memobook": None,
+    "memobooks": [],
+    "preview_delay_ms": 150,  # the memo is previewed only if it stays focused that long
+    "prefetch_rows": 5,  # memos rendered ahead, below and above the focused one
+}
+
+NAME_PREFIX_SEARCH_MAX_CHARS = 2  # shorter queries search only the beginning of memo names
 READABILITY_JS = (Path(__file__).parent / "Readability.js").read_text(encoding="utf-8")
+# shown under the preview of the beginning of a large memo
+LOAD_MORE_HTML = (
+    '<p><button type="button" onclick="window.webview_load_more.postMessage(\'more\')">{label}</button></p>'
+)
 
 
 class WebviewAction(Enum):
@@ -57,6 +73,24 @@ class MemoBookWindow(wx.Frame):
         if not self.memobooks_path.exists():
             self.memobooks_path.mkdir()
         self.web_view_action = WebviewAction.NONE
+        # the memo page is loaded once, then only its content is replaced (see `_show_html_content`)
+        self._is_memo_page_loaded = False
+        self._is_memo_page_loading = False
+        # previews are rendered in the background, a newer focus drops the older previews
+        self._preview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+        self._preview_generation = 0
+        self._preview_timer = None
+        self._partial_preview = None  # (name, parts) of the previewed large memo, see `MemoBook.get_memo_preview`
+        # the memos around the focused one are rendered ahead, until the list or the focus changes
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self._prefetch_generation = 0
+        self.memobook = None
+        self.data = []  # the memos in the order of the list rows
+        self._scores = {}  # the relevance of the found memos by name, see `MemoBook.search_ranked`
+        self._rows = None  # memo name -> row, built on demand
+        # searches run in the background, a newer search cancels the older ones
+        self._search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+        self._search_generation = 0
 
         self.init_ui()
         self._load_memobooks()
@@ -79,6 +113,10 @@ class MemoBookWindow(wx.Frame):
         p = Path(str_path)
         return p if p.is_absolute() else self.memobooks_path / p
 
+    def _get_setting(self, key: str):
+        """Get an app setting or its default value if the settings file has no such key."""
+        return self.settings[key] if key in self.settings else DEFAULT_APP_SETTINGS[key]
+
     def _load_memobooks(self):
         """Load the memobooks.
 
@@ -179,6 +217,9 @@ class MemoBookWindow(wx.Frame):
         self.menu_memo_edit_memo = self.menu_memo.Append(wx.ID_ANY, _("Edit\tF4"))
         self.Bind(wx.EVT_MENU, self._on_edit_memo, self.menu_memo_edit_memo)
 
+        self.menu_memo_load_more = self.menu_memo.Append(wx.ID_ANY, _("Load more of the preview\tCtrl+L"))
+        self.Bind(wx.EVT_MENU, self._on_load_more_preview, self.menu_memo_load_more)
+
         self.menu_memo_delete_memos = self.menu_memo.Append(wx.ID_ANY, _("Delete selected\tDel"))
         self.Bind(wx.EVT_MENU, self._on_delete_memos, self.menu_memo_delete_memos)
 
@@ -214,12 +255,14 @@ class MemoBookWindow(wx.Frame):
         self.list_memos.SetEmptyListMsg(_("No memos found"))
         self.list_memos.Bind(wx.EVT_LIST_ITEM_FOCUSED, self._on_focus_memo)
         self.list_memos.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self._on_activate_memo)
+        self.list_memos.Bind(EVT_SORT, self._on_sort_memos)
         self.left_sizer.Add(self.list_memos, 1, wx.ALL | wx.EXPAND, 5)
 
         ############################################################ right part
 
         self.web_view = wx.html2.WebView.New(self.panel, wx.ID_ANY)
         self.web_view.AddScriptMessageHandler("webview_tab_event")
+        self.web_view.AddScriptMessageHandler("webview_load_more")
 
         # add left and right parts to main sizer
         self.main_sizer.Add(self.left_sizer, 1, wx.ALL | wx.EXPAND, 5)
@@ -230,6 +273,8 @@ class MemoBookWindow(wx.Frame):
         self.panel.Layout()
         self.main_sizer.Fit(self.panel)
 
+        self.status_bar = self.CreateStatusBar()
+
         self.Maximize(True)
 
         # bind WebView events
@@ -237,6 +282,7 @@ class MemoBookWindow(wx.Frame):
         self.Bind(wx.html2.EVT_WEBVIEW_ERROR, self._on_webview_error, self.web_view)
         self.Bind(wx.html2.EVT_WEBVIEW_NEWWINDOW, self._on_webview_newwindow, self.web_view)
         self.Bind(wx.html2.EVT_WEBVIEW_SCRIPT_MESSAGE_RECEIVED, self._on_webview_script_message_recieved)
+        self.Bind(wx.EVT_CLOSE, self._on_close)
         """ TODO: bind events if needed
         self.Bind(wx.html2.EVT_WEBVIEW_NAVIGATING, self._on_webview_navigating, self.web_view)
         self.Bind(wx.html2.EVT_WEBVIEW_NAVIGATED, self._on_webview_navigated, self.web_view)
@@ -245,17 +291,41 @@ class MemoBookWindow(wx.Frame):
     def _open_memobook(self, memobook_str_path: Path):
         """Open the memobook at the given path."""
         memobook_path = self._get_memobook_path(memobook_str_path)
+        if self.memobook is not None:
+            self.memobook.close()
+        self._preview_generation += 1
+        self._prefetch_generation += 1
         self.memobook = MemoBook(memobook_path)
+        self.memobook.watch(lambda: wx.CallAfter(self._on_memobook_changed))
+        threading.Thread(target=self._build_index, args=(self.memobook,), name="indexer", daemon=True).start()
 
         def rename_memo(memo, new_name):
             new_name = new_name.strip()
-            if not new_name or new_name == memo["name"]:
+            if not new_name or new_name == memo.name:
                 return
-            name = self.memobook.rename_memo(old_name=memo["name"], new_name=new_name)
+            name = self.memobook.rename_memo(old_name=memo.name, new_name=new_name)
             self._update_memos(name)
 
         self.list_memos.SetFocus()
-        self.list_memos.SetColumns([ColumnDefn(self.memobook.name, "left", 800, "name", valueSetter=rename_memo)])
+        self.list_memos.SetColumns(
+            [
+                ColumnDefn(self.memobook.name, "left", 400, "name", valueSetter=rename_memo),
+                ColumnDefn(_("Title"), "left", 250, "title", isEditable=False),
+                ColumnDefn(_("Site"), "left", 120, "domain", isEditable=False),
+                ColumnDefn(_("Hashtags"), "left", 150, "hashtags", stringConverter=" ".join, isEditable=False),
+                ColumnDefn(
+                    _("Modified"), "left", 130, "mtime_ns", stringConverter=self._format_mtime, isEditable=False
+                ),
+                ColumnDefn(
+                    _("Score"),
+                    "right",
+                    70,
+                    self._get_memo_score,
+                    stringConverter=lambda score: f"{score:.2f}" if score else "",
+                    isEditable=False,
+                ),
+            ]
+        )
         self._update_memos(focus_on=0)
         self.settings["last_opened_memobook"] = memobook_str_path
         self.settings.save()
@@ -264,6 +334,9 @@ class MemoBookWindow(wx.Frame):
     def _update_memos(self, focus_on: str | int | None = None):
         """Update the list of memos.
 
+        The memos are searched in a background thread and shown by `_show_memos`.
+        Every call cancels the searches started before it.
+
         Args:
             focus_on: The item to focus on.
                 If None, the focus will be not changed.
@@ -271,23 +344,66 @@ class MemoBookWindow(wx.Frame):
                 If a str, the name of the memo to focus on.
                 If True, the search text will be reset to an empty string and first item will be focused.
         """
-        search_text = self.search_text.GetValue()
-        if len(search_text) < MIN_CHARS_TO_SEARCH:
-            self.data = self.memobook.get_memos()
+        self._search_generation += 1
+        search_text = self.search_text.GetValue().strip()
+        prefix = ""
+        query = ""
+        if len(search_text) <= NAME_PREFIX_SEARCH_MAX_CHARS and not search_text.startswith(("-", '"', "(")):
+            prefix = search_text
+        else:
+            query = search_text
+        top_k = max(1, self.list_memos.GetCountPerPage())  # only the first page is ordered by score
+        self._search_executor.submit(
+            self._search_memos, self.memobook, self._search_generation, prefix, query, focus_on, top_k
+        )
+
+    def _search_memos(self, memobook, generation: int, prefix: str, query: str, focus_on, top_k: int):
+        """Search the memos in a background thread and post the result to the UI thread.
+
+        Args:
+            memobook: The memobook to search in.
+            generation: The generation of the search, the search is cancelled when a newer one starts.
+            prefix: The prefix of the memo names to search for (for very short queries).
+            query: The search query, see the `query` module.
+            focus_on: The item to focus on, see `_update_memos`.
+            top_k: The number of the most relevant memos listed first, ordered by score.
+        """
+
+        def is_cancelled():
+            return generation != self._search_generation
+
+        if is_cancelled():
+            return
+        scores = {}
+        if prefix:
+            data = memobook.search_name_prefix(prefix)
+        elif query:
+            data, scores = memobook.search_query(query, is_cancelled=is_cancelled, top_k=top_k)
         else:
-            search_words = search_text.lower().split()
-            include = []
-            exclude = []
-            for word in search_words:
-                if word.startswith("-"):
-                    exclude.append(word[1:])
-                else:
-                    include.append(word)
-            # filter memos
-            self.data = self.memobook.search(include=include, exclude=exclude, quick_search=False)
-        self.list_memos.SetObjects(self.data)
+            data = memobook.get_memos()
+        if not is_cancelled():
+            wx.CallAfter(self._show_memos, generation, data, focus_on, scores)
+
+    def _show_memos(self, generation: int, data, focus_on, scores=None):
+        """Show the result of a search, unless a newer search has been started.
+
+        Args:
+            generation: The generation of the search.
+            data: The found memos.
+            focus_on: The item to focus on, see `_update_memos`.
+            scores: The relevance of the found memos by name.
+        """
+        if generation != self._search_generation:
+            return
+        self._prefetch_generation += 1
+        self._scores = scores or {}
+        self.list_memos.SetObjects(data)
+        # the list keeps its own (sorted) copy of the memos, sorting it later keeps `self.data` in sync
+        self.data = self.list_memos.GetFilteredObjects()
+        self._rows = None
         if len(self.data) == 0:
-            self.web_view.SetPage("<h1>No memos found</h1>", "")  # TODO: use "about app" page
+            self._partial_preview = None
+            self._show_html_content("<h1>No memos found</h1>")  # TODO: use "about app" page
             return
         if focus_on is None:
             return
@@ -301,6 +417,35 @@ class MemoBookWindow(wx.Frame):
         self.list_memos.Focus(focus_on)
         return
 
+    def _build_index(self, memobook):
+        """Build or update the index of the memobook in a background thread.
+
+        Until the index is built, the memobook lists and searches memos by scanning its directory.
+        """
+
+        def on_progress(done, total):
+            wx.CallAfter(self._show_index_progress, memobook, done, total)
+
+        if memobook.build_index(on_progress=on_progress):
+            wx.CallAfter(self._on_index_built, memobook)
+
+    def _show_index_progress(self, memobook, done: int, total: int):
+        """Show the progress of the index build in the status bar."""
+        if memobook is self.memobook:
+            self.status_bar.SetStatusText(_("Indexing") + f" {memobook.name}: {done}/{total}")
+
+    def _on_index_built(self, memobook):
+        """Refresh the list with the built index."""
+        if memobook is not self.memobook:
+            return
+        self.status_bar.SetStatusText("")
+        self._on_memobook_changed()
+
+    def _on_memobook_changed(self):
+        """Refresh the list after memo files have been changed by another program."""
+        focused_memo = self._get_focused_memo()
+        self._update_memos(focused_memo.name if focused_memo else None)
+
     def _get_focused_memo(self):
         """Get the focused memo.
 
@@ -321,10 +466,11 @@ class MemoBookWindow(wx.Frame):
         Returns:
             The index of the memo with the given title, or None if no memo was found.
         """
-        for i, memo in enumerate(self.data):
-            if memo["name"] == name:
-                return i
-        return None
+        if isinstance(self.data, CatalogView):
+            return self.data.index_of(name)
+        if self._rows is None:
+            self._rows = {memo.name: i for i, memo in enumerate(self.data)}
+        return self._rows.get(name)
 
     def _get_webview_links(self):
         """Get all links in the web view.
@@ -449,6 +595,34 @@ class MemoBookWindow(wx.Frame):
             url = ""
         return url
 
+    def _check_bookmark_is_new(self, url: str) -> bool:
+        """Check if the URL is already bookmarked before fetching it.
+
+        If it is, the user can go to the existing memo, add the bookmark anyway or cancel.
+
+        Args:
+            url: The URL of the bookmark.
+
+        Returns:
+            True if the bookmark should be added.
+        """
+        names = self.memobook.find_memos_by_link(url)
+        if not names:
+            return True
+        with wx.MessageDialog(
+            self,
+            _("This page is already bookmarked") + f": {names[0]}",
+            _("Add bookmark"),
+            wx.YES_NO | wx.CANCEL | wx.ICON_QUESTION,
+        ) as dlg:
+            dlg.SetYesNoCancelLabels(_("Go to memo"), _("Add anyway"), _("Cancel"))
+            answer = dlg.ShowModal()
+        if answer == wx.ID_YES:
+            self.search_text.SetValue("")  # to reset the search results
+            self._update_memos(names[0])
+            self.list_memos.SetFocus()
+        return answer == wx.ID_NO
+
     def _on_quick_add_bookmark(self, event):
         """Quickly add a bookmark.
 
@@ -464,9 +638,11 @@ class MemoBookWindow(wx.Frame):
         if not validate_url(url):
             wx.MessageBox(_("Invalid URL"), _("Error"), wx.OK | wx.ICON_ERROR)
             return
+        if not self._check_bookmark_is_new(url):
+            return
         self.parse_params = {"include_bookmark_content": False}
         self.web_view_action = WebviewAction.ADD_BOOKMARK
-        self.web_view.LoadURL(url)
+        self._load_url(url)
         return
 
     def _on_add_bookmark(self, event):
@@ -486,15 +662,31 @@ class MemoBookWindow(wx.Frame):
         if not validate_url(url):
             wx.MessageBox(_("Invalid URL"), _("Error"), wx.OK | wx.ICON_ERROR)
             return
+        if not self._check_bookmark_is_new(url):
+            return
         self.parse_params = {
             "include_bookmark_content": True,
             "include_links": dlg.include_links,
             "include_images": dlg.include_images,
         }
         self.web_view_action = WebviewAction.ADD_BOOKMARK
-        self.web_view.LoadURL(url)
+        self._load_url(url)
         return
 
+    def _on_close(self, event):
+        """Stop the background searches and previews and close the memobook."""
+        self._search_generation += 1
+        self._preview_generation += 1
+        self._prefetch_generation += 1
+        if self._preview_timer is not None:
+            self._preview_timer.Stop()
+        self._search_executor.shutdown(wait=True, cancel_futures=True)
+        self._preview_executor.shutdown(wait=True, cancel_futures=True)
+        self._prefetch_executor.shutdown(wait=True, cancel_futures=True)
+        if self.memobook is not None:
+            self.memobook.close()
+        event.Skip()
+
     def _on_webview_navigating(self, event):
         pass
 
@@ -502,6 +694,10 @@ class MemoBookWindow(wx.Frame):
         pass
 
     def _on_webview_loaded(self, event):
+        if self._is_memo_page_loading and self.web_view_action == WebviewAction.NONE:
+            self._is_memo_page_loading = False
+            self._is_memo_page_loaded = True
+            return
         if self.web_view_action != WebviewAction.ADD_BOOKMARK or event.GetURL() == "about:blank":
             return
         self.web_view_action = WebviewAction.NONE
@@ -517,7 +713,10 @@ class MemoBookWindow(wx.Frame):
         os.startfile(url)  # noqa: S606
 
     def _on_webview_script_message_recieved(self, event):
-        """Process `tab` key event."""
+        """Process `tab` key event and the "load more" button of a partial preview."""
+        if event.GetMessageHandlerName() == "webview_load_more":
+            self._on_load_more_preview(event)
+            return
         self.list_memos.SetFocus()
         event.Skip()
 
@@ -534,7 +733,7 @@ class MemoBookWindow(wx.Frame):
             article = None
         if not success or not article_json or not article:
             wx.MessageBox(_("Could not get the page"), _("Error"), wx.OK | wx.ICON_ERROR)
-            self.web_view.LoadURL("about:blank")  # TODO: make help page
+            self._load_url("about:blank")  # TODO: make help page
             return
         url = self.web_view.GetCurrentURL()
         domain_name = get_domain_name_from_url(url)
@@ -562,7 +761,7 @@ class MemoBookWindow(wx.Frame):
         item = self._get_focused_memo()
         if not item:
             return
-        name = item["name"]
+        name = item.name
         content = self.memobook.get_memo_markdown(name)
         edit_dlg = EditorDialog(parent=self, title=_("Edit memo"), value=content)
         if edit_dlg.ShowModal() != wx.ID_OK:
@@ -588,16 +787,154 @@ class MemoBookWindow(wx.Frame):
         # delete memos
         focused_item_index = self.list_memos.GetFocusedItem()
         for item in selected_items:
-            self.memobook.delete_memo(item["name"])
+            self.memobook.delete_memo(item.name)
         self._update_memos(focus_on=focused_item_index)
 
+    @staticmethod
+    def _format_mtime(mtime_ns: int) -> str:
+        """Format the modification time of a memo for the list, empty if it is not known yet (see `MemoRecord`)."""
+        return datetime.fromtimestamp(mtime_ns / 1e9).strftime("%Y-%m-%d %H:%M") if mtime_ns else ""  # noqa: DTZ006
+
+    def _get_memo_score(self, memo) -> float:
+        """Get the relevance of a memo in the search result shown in the list, 0 if it is not ranked."""
+        return self._scores.get(memo.name, 0.0)
+
     ######################################## list events
 
+    def _on_sort_memos(self, event):
+        """Forget the rows of the memos, the list is about to be sorted in place.
+
+        A catalog view is sorted by its columns here, so the list does not create a record per memo to sort it.
+        """
+        self._rows = None
+        memos = self.list_memos.modelObjects
+        if isinstance(memos, CatalogView):
+            column = self.list_memos.columns[event.sortColumnIndex]
+            if callable(column.valueGetter):
+                memos.sort(key=column.valueGetter, reverse=not event.sortAscending)
+            else:
+                memos.sort_by(column.valueGetter, reverse=not event.sortAscending)
+            self.list_memos.RefreshObjects()
+            event.Handled()
+        event.Skip()
+
     def _on_focus_memo(self, event):
-        """Show the memo in the web view."""
+        """Schedule the preview of the focused memo.
+
+        Rapid focus changes (e.g. holding an arrow key) restart the delay,
+        so only the memo that stays focused is rendered.
+        """
         item = self._get_focused_memo()
-        html = self.memobook.get_memo_html(item["name"])
-        self.web_view.SetPage(html, "")
+        if item is None:
+            return
+        self._preview_generation += 1
+        self._prefetch_generation += 1
+        self._partial_preview = None
+        if self._preview_timer is not None:
+            self._preview_timer.Stop()
+        delay = self._get_setting("preview_delay_ms")
+        self._preview_timer = wx.CallLater(max(1, delay), self._render_preview, self._preview_generation, item.name)
+
+    def _render_preview(self, generation: int, name: str):
+        """Render the preview of a memo and prefetch the memos around it in the background.
+
+        Args:
+            generation: The generation of the preview, it is dropped when another memo gets focused.
+            name: The name of the memo.
+        """
+        if generation != self._preview_generation:
+            return
+        self._preview_executor.submit(self._load_preview, self.memobook, generation, name)
+        self._prefetch_around(self.list_memos.GetFocusedItem())
+
+    def _load_preview(self, memobook, generation: int, name: str, parts: int = 1):
+        """Load the preview of a memo in a background thread and post it to the UI thread.
+
+        Args:
+            memobook: The memobook of the memo.
+            generation: The generation of the preview.
+            name: The name of the memo.
+            parts: The number of parts of a large memo to preview.
+        """
+        if generation != self._preview_generation:
+            return
+        try:
+            content, is_partial = memobook.get_memo_preview(name, parts)
+        except FileNotFoundError:
+            return
+        # more of the same memo keeps the scroll position
+        wx.CallAfter(self._show_preview, generation, content, (name, parts) if is_partial else None, parts > 1)
+
+    def _on_load_more_preview(self, event):
+        """Preview the next part of the previewed large memo, keeping the scroll position."""
+        if self._partial_preview is None:
+            return
+        name, parts = self._partial_preview
+        self._preview_generation += 1
+        self._preview_executor.submit(self._load_preview, self.memobook, self._preview_generation, name, parts + 1)
+
+    def _prefetch_around(self, index: int):
+        """Render the memos around the given row into the content cache in the background.
+
+        The nearest rows go first, the next row before the previous one, since the list is mostly read downwards.
+        The prefetching is cancelled when the list or the focus changes.
+
+        Args:
+            index: The index of the focused row.
+        """
+        if index < 0:
+            return
+        self._prefetch_generation += 1
+        generation = self._prefetch_generation
+        names = []
+        for distance in range(1, self._get_setting("prefetch_rows") + 1):
+            names.extend(self.data[i].name for i in (index + distance, index - distance) if 0 <= i < len(self.data))
+        if names:
+            self._prefetch_executor.submit(
+                self.memobook.prefetch_memos, names, is_cancelled=lambda: generation != self._prefetch_generation
+            )
+
+    def _show_preview(self, generation: int, content: str, partial_preview=None, keep_scroll: bool = False):
+        """Show the rendered preview, unless another memo has been focused meanwhile.
+
+        Args:
+            generation: The generation of the preview.
+            content: The rendered HTML content.
+            partial_preview: (name, parts) if the content is only the beginning of a large memo.
+            keep_scroll: If True, the preview is not scrolled to the top.
+        """
+        if generation != self._preview_generation:
+            return
+        self._partial_preview = partial_preview
+        if partial_preview is not None:
+            content += LOAD_MORE_HTML.format(label=_("Load more"))
+        self._show_html_content(content, keep_scroll)
+
+    def _show_html_content(self, content: str, keep_scroll: bool = False):
+        """Show the rendered content in the web view.
+
+        The first call loads the memo page, the next ones only replace the content of the loaded page,
+        which is much cheaper than loading a page. The time it takes is written to the debug log.
+
+        Args:
+            content: The rendered HTML content.
+            keep_scroll: If True, the content is not scrolled to the top.
+        """
+        start = time.perf_counter()
+        if self._is_memo_page_loaded:
+            success, _result = self.web_view.RunScript(f"setContent({json.dumps(content)}, {json.dumps(keep_scroll)});")
+            if not success:  # the page is gone, load it again
+                self._is_memo_page_loaded = False
+        if not self._is_memo_page_loaded:
+            self._is_memo_page_loading = True
+            self.web_view.SetPage(memo_template.fill(content), "")
+        wx.LogDebug(f"Preview content shown in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def _load_url(self, url: str):
+        """Load the URL in the web view, replacing the memo page."""
+        self._is_memo_page_loaded = False
+        self._is_memo_page_loading = False
+        self.web_view.LoadURL(url)
 
     def _on_activate_memo(self, event):
         """Open in browser first link in Web view."""
@@ -0,0 +1,178 @@
+"""Caches for the memo package."""
+
+import contextlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class LRUCache:
+    """A thread-safe mapping that keeps only the most recently used items.
+
+    The cache can be limited by the number of items, by the total size of the items or both.
+
+    Methods:
+        get: Get an item and mark it as the most recently used.
+        put: Add an item, evicting the least recently used items if the cache is full.
+        clear: Remove all items.
+    """
+
+    def __init__(self, max_items: int | None = None, max_size: int | None = None, get_size=sys.getsizeof) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_items: The maximum number of items in the cache, unlimited if None.
+            max_size: The maximum total size of the items in bytes, unlimited if None.
+            get_size: Callable that returns the size of an item in bytes.
+        """
+        self.max_items = max_items
+        self.max_size = max_size
+        self._get_size = get_size
+        self._items = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Get the item with the given key and mark it as the most recently used."""
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value) -> None:
+        """Add an item, evicting the least recently used items if the cache is full.
+
+        An item larger than `max_size` is not cached.
+        """
+        size = self._get_size(value) if self.max_size is not None else 0
+        with self._lock:
+            self._remove(key)
+            if self.max_size is not None and size > self.max_size:
+                return
+            self._items[key] = value
+            self._sizes[key] = size
+            self.size += size
+            while (self.max_items is not None and len(self._items) > self.max_items) or (
+                self.max_size is not None and self.size > self.max_size
+            ):
+                self._remove(next(iter(self._items)))
+
+    def _remove(self, key) -> None:
+        """Remove an item if it is in the cache."""
+        if key in self._items:
+            del self._items[key]
+            self.size -= self._sizes.pop(key)
+
+    def clear(self) -> None:
+        """Remove all items."""
+        with self._lock:
+            self._items.clear()
+            self._sizes.clear()
+            self.size = 0
+
+    def items(self):
+        """Return the items, from the least to the most recently used."""
+        with self._lock:
+            return list(self._items.items())
+
+    def __contains__(self, key):
+        """Check if the given key is in the cache."""
+        return key in self._items
+
+    def __len__(self):
+        """Return the number of items in the cache."""
+        return len(self._items)
+
+    def __repr__(self):
+        """Return the representation of the cache."""
+        return f"LRUCache(items={len(self)}, size={self.size}, hits={self.hits}, misses={self.misses})"
+
+
+class DiskCache:
+    """A directory of text files that keeps only the most recently used ones within a size limit.
+
+    Every item is a file named by its key, the file mtime is its last use time.
+
+    Methods:
+        get: Get an item and mark it as the most recently used.
+        put: Add an item, evicting the least recently used items if the cache is too large.
+    """
+
+    def __init__(self, path: Path, max_size: int, suffix: str = "") -> None:
+        """Open a cache in the given directory, the directory is created on the first `put`.
+
+        Args:
+            path: The directory of the cache.
+            max_size: The maximum total size of the files in bytes.
+            suffix: The suffix of the file names.
+        """
+        self._path = path
+        self.max_size = max_size
+        self._suffix = suffix
+        self._lock = threading.Lock()
+        self._size = None  # computed on the first `put`
+
+    def _get_item_path(self, key: str) -> Path:
+        return self._path / f"{key}{self._suffix}"
+
+    def get(self, key: str) -> str | None:
+        """Get the item with the given key or None if it is not cached."""
+        item_path = self._get_item_path(key)
+        try:
+            value = item_path.read_text(encoding="utf-8")
+            os.utime(item_path)
+        except OSError:
+            return None
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        """Add an item, evicting the least recently used items if the cache is too large."""
+        data = value.encode("utf-8")
+        if len(data) > self.max_size:
+            return
+        item_path = self._get_item_path(key)
+        with self._lock:
+            try:
+                self._path.mkdir(parents=True, exist_ok=True)
+                if self._size is None:
+                    self._size = sum(size for _path, _mtime, size in self._scan())
+                with contextlib.suppress(FileNotFoundError):
+                    self._size -= item_path.stat().st_size
+                temp_path = item_path.with_name(f".{item_path.name}.tmp")
+                temp_path.write_bytes(data)
+                temp_path.replace(item_path)
+            except OSError:
+                return
+            self._size += len(data)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _scan(self) -> list:
+        """Get (path, mtime, size) of all cached items."""
+        items = []
+        with os.scandir(self._path) as entries:
+            for entry in entries:
+                if entry.name.endswith(self._suffix) and not entry.name.startswith(".") and entry.is_file():
+                    stat = entry.stat()
+                    items.append((Path(entry.path), stat.st_mtime_ns, stat.st_size))
+        return items
+
+    def _evict(self) -> None:
+        """Delete the least recently used items until the cache is 10% below the size limit."""
+        items = sorted(self._scan(), key=lambda item: item[1])
+        self._size = sum(size for _path, _mtime, size in items)
+        target = self.max_size * 9 // 10
+        for item_path, _mtime, size in items:
+            if self._size <= target:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                item_path.unlink()
+            self._size -= size
@@ -0,0 +1,169 @@
+"""A compact, column-oriented catalog of the memos of a memo book."""
+
+import bisect
+import sys
+from array import array
+from collections.abc import Sequence
+
+from memo import MemoRecord
+
+ROW_TYPECODE = "I"  # unsigned int, 4 bytes per row number
+POSITION_TYPECODE = "i"  # signed int, 4 bytes per position in a view, -1 for the rows not in the view
+
+
+class MemoCatalog:
+    """The memo records of a memo book stored by columns instead of an object per memo.
+
+    The names (sorted, interned), titles and domains are lists of strings,
+    the titles that are the same as the names and equal domains share the same string objects.
+    The mtimes and sizes are `array` columns, the hashtags are tag ids in an `array`,
+    `tag_offsets[row]:tag_offsets[row + 1]` being the tag ids of a row.
+    A `MemoRecord` is created only when a row is accessed (see `get_record` and `CatalogView`).
+    """
+
+    def __init__(self, rows) -> None:
+        """Build the catalog.
+
+        Args:
+            rows: (name, mtime_ns, size, title, hashtags, domain) tuples sorted by name,
+                see `MemoIndex.get_memos`.
+        """
+        self.names = []
+        self.titles = []
+        self.domains = []
+        self.mtimes = array("q")
+        self.sizes = array("q")
+        self.tag_ids = array(ROW_TYPECODE)
+        self.tag_offsets = array(ROW_TYPECODE, [0])
+        self.tags = []  # tag id -> hashtag
+        self._tag_ids = {}  # hashtag -> tag id
+        domains = {}
+        for raw_name, mtime_ns, size, title, hashtags, domain in rows:
+            name = sys.intern(raw_name)
+            self.names.append(name)
+            self.titles.append(name if title == name else title)
+            self.domains.append(domains.setdefault(domain, domain))
+            self.mtimes.append(mtime_ns)
+            self.sizes.append(size)
+            for hashtag in hashtags:
+                tag_id = self._tag_ids.get(hashtag)
+                if tag_id is None:
+                    tag_id = self._tag_ids[hashtag] = len(self.tags)
+                    self.tags.append(hashtag)
+                self.tag_ids.append(tag_id)
+            self.tag_offsets.append(len(self.tag_ids))
+
+    def __len__(self):
+        """Return the number of memos in the catalog."""
+        return len(self.names)
+
+    def get_record(self, row: int) -> MemoRecord:
+        """Create the record of the memo in the given row."""
+        start, end = self.tag_offsets[row], self.tag_offsets[row + 1]
+        return MemoRecord(
+            self.names[row],
+            self.mtimes[row],
+            self.sizes[row],
+            self.titles[row],
+            tuple(self.tags[tag_id] for tag_id in self.tag_ids[start:end]),
+            self.domains[row],
+        )
+
+    def find_row(self, name: str):
+        """Get the row of the memo with the given name or None if there is no such memo."""
+        row = bisect.bisect_left(self.names, name)
+        if row < len(self.names) and self.names[row] == name:
+            return row
+        return None
+
+    def get_rows(self, names) -> array:
+        """Get the rows of the memos with the given names, in the same order, skipping unknown names."""
+        rows = array(ROW_TYPECODE)
+        for name in names:
+            row = self.find_row(name)
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def get_sort_key(self, attribute: str):
+        """Get a sort key of the rows by a `MemoRecord` attribute, without creating the records.
+
+        Args:
+            attribute: "name", "title", "domain", "hashtags", "size" or "mtime_ns".
+
+        Returns:
+            A callable that gets a row and returns its sort key.
+        """
+        if attribute == "name":
+            return lambda row: row  # the rows are sorted by name
+        if attribute in ("title", "domain"):
+            column = getattr(self, f"{attribute}s")
+            return lambda row: column[row].lower()
+        if attribute == "size":
+            return self.sizes.__getitem__
+        if attribute == "mtime_ns":
+            return self.mtimes.__getitem__
+        if attribute == "hashtags":
+            return lambda row: tuple(
+                self.tags[tag_id] for tag_id in self.tag_ids[self.tag_offsets[row] : self.tag_offsets[row + 1]]
+            )
+        raise ValueError(f"Unknown memo attribute: {attribute}")
+
+
+class CatalogView(Sequence):
+    """A sequence of `MemoRecord` backed by rows of a `MemoCatalog`, a record is created on every access.
+
+    It is what `MemoBook` returns instead of a list of records when the columnar catalog is enabled,
+    a list view reads it by index without a Python object per memo.
+    """
+
+    def __init__(self, catalog: MemoCatalog, rows: array | None = None) -> None:
+        """Create a view of the given rows of a catalog.
+
+        Args:
+            catalog: The catalog.
+            rows: An array of the rows of the view, all rows if None.
+        """
+        self.catalog = catalog
+        self._rows = array(ROW_TYPECODE, range(len(catalog))) if rows is None else rows
+        self._positions = None  # row -> position in the view, built on demand by `index_of`
+
+    def __len__(self):
+        """Return the number of memos in the view."""
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        """Get the record at the given index or a view of a slice."""
+        if isinstance(index, slice):
+            return CatalogView(self.catalog, self._rows[index])
+        return self.catalog.get_record(self._rows[index])
+
+    def index_of(self, name: str):
+        """Get the index of the memo with the given name or None if it is not in the view."""
+        row = self.catalog.find_row(name)
+        if row is None:
+            return None
+        if self._positions is None:
+            self._positions = array(POSITION_TYPECODE, [-1]) * len(self.catalog)
+            for position, view_row in enumerate(self._rows):
+                self._positions[view_row] = position
+        position = self._positions[row]
+        return None if position < 0 else position
+
+    def sort_by(self, attribute: str, reverse: bool = False) -> None:
+        """Sort the view in place by a `MemoRecord` attribute (see `MemoCatalog.get_sort_key`)."""
+        self._rows = array(ROW_TYPECODE, sorted(self._rows, key=self.catalog.get_sort_key(attribute), reverse=reverse))
+        self._positions = None
+
+    def sort(self, key=None, reverse: bool = False) -> None:
+        """Sort the view in place like a list, `key` gets the records."""
+        get_record = self.catalog.get_record
+        self._rows = array(
+            ROW_TYPECODE,
+            sorted(self._rows, key=(lambda row: key(get_record(row))) if key else None, reverse=reverse),
+        )
+        self._positions = None
+
+    def __repr__(self):
+        """Return the representation of the view."""
+        return f"CatalogView(rows={len(self)})"
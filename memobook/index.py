@@ -0,0 +1,613 @@
+"""A persistent index of the memos in a memo book."""
+
+import contextlib
+import functools
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+
+INDEX_FILE_NAME = ".index.db"
+INDEX_SCHEMA_VERSION = 9
+TOKEN_REGEX = re.compile(r"\w+")
+TRIGRAM_LENGTH = 3
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memos (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    hashtags TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    link TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS memos_domain ON memos (domain);
+CREATE INDEX IF NOT EXISTS memos_link ON memos (link);
+CREATE TABLE IF NOT EXISTS tokens (
+    id INTEGER PRIMARY KEY,
+    token TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token_id INTEGER NOT NULL REFERENCES tokens (id),
+    memo_id INTEGER NOT NULL REFERENCES memos (id) ON DELETE CASCADE,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (token_id, memo_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_memo_id ON postings (memo_id);
+CREATE TABLE IF NOT EXISTS trigrams (
+    gram TEXT NOT NULL,
+    memo_id INTEGER NOT NULL REFERENCES memos (id) ON DELETE CASCADE,
+    PRIMARY KEY (gram, memo_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS trigrams_memo_id ON trigrams (memo_id);
+CREATE TABLE IF NOT EXISTS memo_tags (
+    tag TEXT NOT NULL,
+    memo_id INTEGER NOT NULL REFERENCES memos (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, memo_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS memo_tags_memo_id ON memo_tags (memo_id);
+"""
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS memos_fts USING fts5 (name, content)"
+
+
+def tokenize(text: str) -> list:
+    """Split a text into word tokens, lowercased like the text searched by `matcher.SearchMatcher`."""
+    return TOKEN_REGEX.findall(text.lower())
+
+
+def get_content_hash(content: str) -> str:
+    """Get the hash of the content of a memo."""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def get_trigrams(text: str) -> set:
+    """Get all the trigrams (substrings of length 3) of a text."""
+    return {text[i : i + TRIGRAM_LENGTH] for i in range(len(text) - TRIGRAM_LENGTH + 1)}
+
+
+def analyze_content(name: str, content: str) -> tuple:
+    """Compute what the index stores for the content of a memo.
+
+    This is the CPU-bound part of indexing, it does not need the index itself
+    and can be run in another process (see `indexer.build_index`).
+
+    Args:
+        name: The name of the memo.
+        content: The content (markdown) of the memo.
+
+    Returns:
+        A tuple of the content hash, the counts of the tokens and the set of the trigrams.
+    """
+    # the name and the content are joined as in a scan, so a word across them is in a token too
+    text = f"{name}{content}".lower()
+    return get_content_hash(content), dict(Counter(TOKEN_REGEX.findall(text))), get_trigrams(text)
+
+
+def synchronized(method):
+    """Serialize the calls of a `MemoIndex` method, the index is shared by the UI and the search threads."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class MemoIndex:
+    """An SQLite index of the memos in a memo book.
+
+    For every memo the index stores its name, mtime, size, content hash, title, hashtags, normalized link and domain,
+    so listing a memo book is a single query instead of a directory scan
+    and the changed memo files can be found by their stat (see `get_manifest`).
+    It also keeps an inverted index of the casefolded word tokens of every memo
+    (name and content), so content search is a set operation over postings,
+    and of the trigrams of the lowercased name and content, which give the candidates
+    for an arbitrary substring search. The lowercased hashtags of every memo are posted
+    separately, so a hashtag is found without reading or matching the contents (see `find_tag`).
+    The token counts and the length of every memo in tokens give the statistics of BM25 ranking
+    (see `get_term_statistics`).
+    Optionally it keeps an SQLite FTS5 table of the memo names and contents for ranked search.
+    """
+
+    def __init__(self, path: Path, full_text_search: bool = False) -> None:
+        """Open or create the index at the given path.
+
+        If the index does not exist, was created by another schema version, was not completely built
+        or the FTS5 table has just been created, `is_new` is set to True: the index has to be (re)built
+        and marked as built with `mark_built`.
+
+        Args:
+            path: The path to the index file.
+            full_text_search: If True, maintain the FTS5 table (if SQLite supports it), otherwise drop it.
+        """
+        self._path = path
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._token_ids = {}  # term -> ids of the tokens containing it, until the vocabulary changes
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self.is_new = False
+        self.has_full_text_search = False
+        self._create_schema()
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        if full_text_search:
+            self._create_full_text_search()
+        else:
+            with self._connection:
+                self._connection.execute("DROP TABLE IF EXISTS memos_fts")
+
+    def _create_schema(self) -> None:
+        """Create the tables, dropping them if the schema version has changed or the index was not built."""
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version == INDEX_SCHEMA_VERSION:
+            return
+        with self._connection:
+            tables = self._connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+            for (table,) in tables:
+                self._connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self._connection.executescript(INDEX_SCHEMA)
+        self.is_new = True
+
+    @synchronized
+    def mark_built(self) -> None:
+        """Mark the index as completely built, the schema version is stored only then."""
+        with self._connection:
+            self._connection.execute(f"PRAGMA user_version = {INDEX_SCHEMA_VERSION}")
+        self.is_new = False
+
+    def _create_full_text_search(self) -> None:
+        """Create the FTS5 table if SQLite is built with FTS5."""
+        exists = self._connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'memos_fts'").fetchone()
+        if exists:
+            self.has_full_text_search = True
+            return
+        try:
+            with self._connection:
+                self._connection.execute(FTS_SCHEMA)
+        except sqlite3.OperationalError:  # no FTS5 in this SQLite build
+            return
+        self.has_full_text_search = True
+        # the FTS5 table has to be filled from all the memos
+        with self._connection:
+            self._connection.execute("PRAGMA user_version = 0")
+        self.is_new = True
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Commit the changes on exit, unless they are a part of a batch."""
+        if self._batch_depth:
+            yield
+            return
+        with self._connection:
+            yield
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Make all the changes inside the `with` block in a single transaction."""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                if self._batch_depth > 1:
+                    yield
+                    return
+                with self._connection:
+                    yield
+            finally:
+                self._batch_depth -= 1
+
+    @synchronized
+    def close(self) -> None:
+        """Close the index."""
+        self._connection.close()
+
+    @synchronized
+    def upsert(
+        self,
+        name: str,
+        mtime_ns: int,
+        size: int,
+        title: str,
+        hashtags,
+        domain: str,
+        link: str,
+        content: str | None,
+        analysis: tuple | None = None,
+    ) -> None:
+        """Add a memo to the index or update it.
+
+        Args:
+            name: The name of the memo.
+            mtime_ns: The modification time of the memo file in nanoseconds.
+            size: The size of the memo file in bytes.
+            title: The title of the memo.
+            hashtags: The hashtags of the memo.
+            domain: The domain name of the link of the memo.
+            link: The normalized link of the memo (see `utils.normalize_url`), an empty string if it has no link.
+            content: The content (markdown) of the memo, can be None with `analysis` if the index has no FTS5 table.
+            analysis: The result of `analyze_content` for the memo, if it is already computed.
+        """
+        content_hash, token_counts, trigrams = analysis or analyze_content(name, content)
+        with self._transaction():
+            (memo_id,) = self._connection.execute(
+                """
+                INSERT INTO memos (name, mtime_ns, size, title, hashtags, domain, link, hash, length)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    mtime_ns = excluded.mtime_ns,
+                    size = excluded.size,
+                    title = excluded.title,
+                    hashtags = excluded.hashtags,
+                    domain = excluded.domain,
+                    link = excluded.link,
+                    hash = excluded.hash,
+                    length = excluded.length
+                RETURNING id
+                """,
+                (
+                    name,
+                    mtime_ns,
+                    size,
+                    title,
+                    " ".join(sorted(hashtags)),
+                    domain,
+                    link,
+                    content_hash,
+                    sum(token_counts.values()),
+                ),
+            ).fetchone()
+            self._update_postings(memo_id, token_counts)
+            self._update_trigrams(memo_id, trigrams)
+            self._update_tags(memo_id, hashtags)
+            if self.has_full_text_search:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO memos_fts (rowid, name, content) VALUES (?, ?, ?)", (memo_id, name, content)
+                )
+
+    def _update_postings(self, memo_id: int, counts: dict) -> None:
+        """Replace the postings of a memo with the given token counts."""
+        self._token_ids.clear()
+        self._connection.execute("DELETE FROM postings WHERE memo_id = ?", (memo_id,))
+        self._connection.executemany("INSERT OR IGNORE INTO tokens (token) VALUES (?)", ((t,) for t in counts))
+        self._connection.executemany(
+            "INSERT INTO postings (token_id, memo_id, count) SELECT id, ?, ? FROM tokens WHERE token = ?",
+            ((memo_id, count, token) for token, count in counts.items()),
+        )
+
+    def _update_trigrams(self, memo_id: int, trigrams) -> None:
+        """Replace the trigrams of a memo with the given ones."""
+        self._connection.execute("DELETE FROM trigrams WHERE memo_id = ?", (memo_id,))
+        self._connection.executemany(
+            "INSERT INTO trigrams (gram, memo_id) VALUES (?, ?)", ((gram, memo_id) for gram in trigrams)
+        )
+
+    def _update_tags(self, memo_id: int, hashtags) -> None:
+        """Replace the hashtag postings of a memo with the given hashtags."""
+        self._connection.execute("DELETE FROM memo_tags WHERE memo_id = ?", (memo_id,))
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO memo_tags (tag, memo_id) VALUES (?, ?)",
+            ((hashtag.lower(), memo_id) for hashtag in hashtags),
+        )
+
+    @synchronized
+    def rename(self, old_name: str, new_name: str) -> None:
+        """Rename a memo in the index.
+
+        Args:
+            old_name: The old name of the memo.
+            new_name: The new name of the memo.
+        """
+        with self._transaction():
+            self._connection.execute("UPDATE memos SET name = ? WHERE name = ?", (new_name, old_name))
+            if self.has_full_text_search:
+                self._connection.execute(
+                    "UPDATE memos_fts SET name = ? WHERE rowid = (SELECT id FROM memos WHERE name = ?)",
+                    (new_name, new_name),
+                )
+
+    @synchronized
+    def delete(self, name: str) -> None:
+        """Delete a memo from the index.
+
+        Args:
+            name: The name of the memo.
+        """
+        with self._transaction():
+            if self.has_full_text_search:
+                self._connection.execute(
+                    "DELETE FROM memos_fts WHERE rowid = (SELECT id FROM memos WHERE name = ?)", (name,)
+                )
+            self._connection.execute("DELETE FROM memos WHERE name = ?", (name,))
+
+    @synchronized
+    def update_stat(self, name: str, mtime_ns: int, size: int) -> None:
+        """Update the stat of a memo whose content has not changed.
+
+        Args:
+            name: The name of the memo.
+            mtime_ns: The modification time of the memo file in nanoseconds.
+            size: The size of the memo file in bytes.
+        """
+        with self._transaction():
+            self._connection.execute("UPDATE memos SET mtime_ns = ?, size = ? WHERE name = ?", (mtime_ns, size, name))
+
+    @synchronized
+    def get_manifest_entry(self, name: str):
+        """Get the indexed (mtime_ns, size, hash) of a memo or None if the memo is not indexed."""
+        return self._connection.execute("SELECT mtime_ns, size, hash FROM memos WHERE name = ?", (name,)).fetchone()
+
+    @synchronized
+    def get_manifest(self) -> dict:
+        """Get the indexed (mtime_ns, size, hash) of all memos by memo name."""
+        return {
+            name: (mtime_ns, size, content_hash)
+            for name, mtime_ns, size, content_hash in self._connection.execute(
+                "SELECT name, mtime_ns, size, hash FROM memos"
+            )
+        }
+
+    @synchronized
+    def get_names(self) -> list:
+        """Get the names of all indexed memos, sorted by name."""
+        return [name for (name,) in self._connection.execute("SELECT name FROM memos ORDER BY name")]
+
+    @synchronized
+    def find(self, word: str):
+        """Find the memos that may contain the given word as a substring.
+
+        A word of at least 3 characters is looked up in the trigram index:
+        the memos containing all its trigrams are the candidates that have to be verified.
+        Shorter words are looked up in the token index (see `_find_tokens`).
+
+        Args:
+            word: The word to find.
+
+        Returns:
+            A tuple of the set of memo names and a flag that is True if the set is exact.
+        """
+        word = word.lower()
+        if len(word) >= TRIGRAM_LENGTH:
+            return self._find_trigrams(word), False
+        return self._find_tokens(word)
+
+    def _find_trigrams(self, word: str) -> set:
+        """Find the memos that contain all the trigrams of the given word."""
+        grams = sorted(get_trigrams(word))
+        placeholders = ", ".join("?" * len(grams))
+        return {
+            name
+            for (name,) in self._connection.execute(
+                f"""
+                SELECT memos.name FROM memos WHERE memos.id IN (
+                    SELECT memo_id FROM trigrams WHERE gram IN ({placeholders})
+                    GROUP BY memo_id HAVING COUNT(*) = ?
+                )
+                """,  # noqa: S608
+                (*grams, len(grams)),
+            )
+        }
+
+    def _find_tokens(self, word: str):
+        """Find the memos that may contain the given word as a substring using the token index.
+
+        A word made of word characters only can only occur inside a single token,
+        so the memos containing it are exactly the postings of the tokens containing it.
+        Otherwise every token of the word must occur in the memo (the first one as a token suffix,
+        the last one as a token prefix), which gives a superset that has to be verified.
+
+        Args:
+            word: The word to find.
+
+        Returns:
+            A tuple of the set of memo names and a flag that is True if the set is exact.
+        """
+        word = word.lower()
+        parts = tokenize(word)
+        exact = len(parts) == 1 and parts[0] == word
+        if not parts:
+            return set(self.get_names()), False
+        if len(parts) == 1:
+            names = {
+                name
+                for (name,) in self._connection.execute(
+                    """
+                    SELECT DISTINCT memos.name FROM postings JOIN memos ON memos.id = postings.memo_id
+                    WHERE postings.token_id IN (SELECT value FROM json_each(?))
+                    """,
+                    (json.dumps(self._get_token_ids(parts[0])),),
+                )
+            }
+            return names, exact
+        names = None
+        last = len(parts) - 1
+        for i, part in enumerate(parts):
+            if i == 0:
+                condition, params = "substr(token, -length(?)) = ?", (part, part)
+            elif i == last:
+                condition, params = "substr(token, 1, length(?)) = ?", (part, part)
+            else:
+                condition, params = "token = ?", (part,)
+            part_names = {
+                name
+                for (name,) in self._connection.execute(
+                    f"""
+                    SELECT DISTINCT memos.name FROM tokens
+                    JOIN postings ON postings.token_id = tokens.id
+                    JOIN memos ON memos.id = postings.memo_id
+                    WHERE {condition}
+                    """,  # noqa: S608
+                    params,
+                )
+            }
+            names = part_names if names is None else names & part_names
+            if not names:
+                break
+        return names, exact
+
+    @synchronized
+    def find_link(self, link: str) -> list:
+        """Get the names of the memos with the given normalized link, sorted by name."""
+        return [
+            name
+            for (name,) in self._connection.execute(
+                "SELECT name FROM memos WHERE link = ? AND link != '' ORDER BY name", (link,)
+            )
+        ]
+
+    @synchronized
+    def find_domain(self, domain: str) -> list:
+        """Get the names of the memos with a link to the given domain, sorted by name."""
+        return [
+            name
+            for (name,) in self._connection.execute(
+                "SELECT name FROM memos WHERE domain = ? AND domain != '' ORDER BY name", (domain,)
+            )
+        ]
+
+    @synchronized
+    def find_tag(self, prefix: str) -> set:
+        """Find the memos with a hashtag that starts with the given prefix (case-insensitive).
+
+        The prefix is a range of the hashtag postings, e.g. "#2024-05" finds the memos of May 2024.
+
+        Args:
+            prefix: The prefix of the hashtag, including "#".
+
+        Returns:
+            The set of memo names.
+        """
+        prefix = prefix.lower()
+        end = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return {
+            name
+            for (name,) in self._connection.execute(
+                """
+                SELECT DISTINCT memos.name FROM memo_tags JOIN memos ON memos.id = memo_tags.memo_id
+                WHERE memo_tags.tag >= ? AND memo_tags.tag < ?
+                """,
+                (prefix, end),
+            )
+        }
+
+    def _get_token_ids(self, term: str) -> list:
+        """Get the ids of the tokens that contain a term, the vocabulary is scanned once per term until it changes."""
+        token_ids = self._token_ids.get(term)
+        if token_ids is None:
+            token_ids = self._token_ids[term] = [
+                token_id
+                for (token_id,) in self._connection.execute("SELECT id FROM tokens WHERE instr(token, ?) > 0", (term,))
+            ]
+        return token_ids
+
+    @synchronized
+    def get_length_statistics(self) -> tuple:
+        """Get the number of memos and their average length in tokens, for BM25 ranking."""
+        memo_count, average_length = self._connection.execute("SELECT COUNT(*), AVG(length) FROM memos").fetchone()
+        return memo_count, average_length or 0.0
+
+    @synchronized
+    def get_term_statistics(self, term: str, names) -> tuple:
+        """Get the statistics of BM25 ranking for a term in the given memos (see `ranking.get_bm25_scores`).
+
+        A term occurs wherever it is a part of a token, like a search word is found inside words.
+        The tokens containing the term are shared with `find`, the postings are read only for the given memos.
+
+        Args:
+            term: The lowercased term.
+            names: The names of the memos to get the term frequencies of, e.g. the found memos.
+
+        Returns:
+            A tuple of the number of memos with the term
+            and a dict {memo name: (the number of occurrences of the term, the length of the memo)}.
+        """
+        token_ids = json.dumps(self._get_token_ids(term))
+        (memo_count,) = self._connection.execute(
+            "SELECT COUNT(DISTINCT memo_id) FROM postings WHERE token_id IN (SELECT value FROM json_each(?))",
+            (token_ids,),
+        ).fetchone()
+        if not memo_count:
+            return 0, {}
+        frequencies = {
+            name: (count, length)
+            for name, count, length in self._connection.execute(
+                """
+                SELECT memos.name, term.count, memos.length FROM (
+                    SELECT memo_id, SUM(count) AS count FROM postings
+                    WHERE token_id IN (SELECT value FROM json_each(?))
+                        -- "+" keeps the postings read by token, not probed for every memo and token
+                        AND +memo_id IN (SELECT id FROM memos WHERE name IN (SELECT value FROM json_each(?)))
+                    GROUP BY memo_id
+                ) AS term JOIN memos ON memos.id = term.memo_id
+                """,
+                (token_ids, json.dumps(list(names))),
+            )
+        }
+        return memo_count, frequencies
+
+    @synchronized
+    def search_full_text(self, include=None, exclude=None) -> list:
+        """Search memo names and contents through the FTS5 table.
+
+        Every word is a prefix query; the memos must match all the include words
+        and none of the exclude words. Words without tokens (e.g. "++") are ignored,
+        the caller has to search them some other way.
+
+        Args:
+            include: The words to include in the search.
+            exclude: The words to exclude from the search.
+
+        Returns:
+            The names of the matching memos, the most relevant (by bm25) first.
+            Without include words the names are sorted by name.
+        """
+
+        def to_fts_query(words, operator):
+            phrases = [f'"{word.replace(chr(34), chr(34) * 2)}"*' for word in words if tokenize(word)]
+            return f" {operator} ".join(phrases)
+
+        positive = to_fts_query(include or [], "AND")
+        negative = to_fts_query(exclude or [], "OR")
+        if positive:
+            query = f"({positive}) NOT ({negative})" if negative else positive
+            return [
+                name
+                for (name,) in self._connection.execute(
+                    """
+                    SELECT memos.name FROM memos_fts JOIN memos ON memos.id = memos_fts.rowid
+                    WHERE memos_fts MATCH ? ORDER BY bm25(memos_fts)
+                    """,
+                    (query,),
+                )
+            ]
+        if not negative:
+            return self.get_names()
+        return [
+            name
+            for (name,) in self._connection.execute(
+                """
+                SELECT name FROM memos WHERE id NOT IN (SELECT rowid FROM memos_fts WHERE memos_fts MATCH ?)
+                ORDER BY name
+                """,
+                (negative,),
+            )
+        ]
+
+    @synchronized
+    def get_memos(self) -> list:
+        """Get all indexed memos, sorted by name.
+
+        Returns:
+            A list of (name, mtime_ns, size, title, hashtags, domain) tuples, the hashtags are a sorted tuple.
+        """
+        return [
+            (name, mtime_ns, size, title, tuple(hashtags.split()), domain)
+            for name, mtime_ns, size, title, hashtags, domain in self._connection.execute(
+                "SELECT name, mtime_ns, size, title, hashtags, domain FROM memos ORDER BY name"
+            )
+        ]
@@ -0,0 +1,111 @@
+"""Build the index of a memo book from scratch, in parallel."""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from index import MemoIndex, analyze_content
+from memo import Memo
+from utils import normalize_url, read_memo_text
+
+INDEX_CHUNK_SIZE = 500  # memo files per task
+PARALLEL_BUILD_MIN_MEMOS = 2000  # smaller memo books are indexed in the current process
+
+
+def analyze_memo_files(path: Path, names, extension: str, include_content: bool = True) -> list:
+    """Read and analyze memo files for the index.
+
+    This runs in the worker processes: decoding, tokenizing and parsing the titles, hashtags and links.
+
+    Args:
+        path: The path to the memo book.
+        names: The names of the memos to analyze.
+        extension: The extension of the memo files.
+        include_content: If False, the content is not sent back to the parent process
+            (only the FTS5 table needs it, the rest of the index gets its analysis).
+
+    Returns:
+        A list of dicts with the keyword arguments of `MemoIndex.upsert`.
+        Memos deleted meanwhile are skipped, memos that could not be read are indexed by their names only.
+    """
+    records = []
+    for name in names:
+        memo_path = path / f"{name}{extension}"
+        stat = None
+        try:
+            # stat first: if the file changes meanwhile, the stat is stale and the memo is reindexed later
+            stat = memo_path.stat()
+            content = read_memo_text(memo_path)
+        except FileNotFoundError:
+            continue
+        except OSError:
+            content = ""  # listed by its name, like `MemoBook._refresh_memo` does, and reindexed when it changes
+        records.append(
+            {
+                "name": name,
+                "mtime_ns": stat.st_mtime_ns if stat else 0,
+                "size": stat.st_size if stat else 0,
+                "title": Memo.parse_title(content),
+                "hashtags": Memo.parse_hashtags(content),
+                "domain": Memo.parse_domain(content),
+                "link": normalize_url(Memo.parse_link(content)),
+                "content": content if include_content else None,
+                "analysis": analyze_content(name, content),
+            }
+        )
+    return records
+
+
+def build_index(
+    index: MemoIndex, path: Path, names, extension: str, on_progress=None, is_cancelled=None, max_workers=None
+) -> bool:
+    """Index the given memo files, spreading them across a process pool in chunks.
+
+    The partial results of the workers are merged into the index as they come, one transaction per chunk,
+    so the index stays usable by other threads during the build.
+
+    Args:
+        index: The index to fill.
+        path: The path to the memo book.
+        names: The names of the memos to index.
+        extension: The extension of the memo files.
+        on_progress: Optional callable that gets the number of indexed memos and the total number of memos.
+        is_cancelled: Optional callable checked after every chunk, the build stops if it returns True.
+        max_workers: The number of worker processes, the number of CPUs by default.
+
+    Returns:
+        True if all the memos have been indexed, False if the build was cancelled.
+    """
+    names = list(names)
+    include_content = index.has_full_text_search
+    chunks = [names[i : i + INDEX_CHUNK_SIZE] for i in range(0, len(names), INDEX_CHUNK_SIZE)]
+    is_cancelled = is_cancelled or (lambda: False)
+    done = 0
+
+    def merge(records, chunk_size):
+        nonlocal done
+        with index.batch():
+            for record in records:
+                index.upsert(**record)
+        done += chunk_size
+        if on_progress:
+            on_progress(done, len(names))
+
+    if len(names) < PARALLEL_BUILD_MIN_MEMOS or (os.cpu_count() or 1) == 1:
+        for chunk in chunks:
+            if is_cancelled():
+                return False
+            merge(analyze_memo_files(path, chunk, extension, include_content), len(chunk))
+        return True
+    # spawned workers do not inherit the threads and the open index connection of the app, as forked ones would
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {
+            executor.submit(analyze_memo_files, path, chunk, extension, include_content): len(chunk) for chunk in chunks
+        }
+        for future in as_completed(futures):
+            if is_cancelled():
+                executor.shutdown(wait=False, cancel_futures=True)
+                return False
+            merge(future.result(), futures[future])
+    return True
@@ -0,0 +1,177 @@
+"""Match the words of a search against many texts."""
+
+import re
+
+# the only non-ASCII characters whose lowercase has ASCII characters: "İ" (i and a combining dot) and "K" (Kelvin)
+ASCII_LOWERING_CHARACTERS = ("\u0130".encode("utf-8"), "\u212a".encode("utf-8"))
+ASCII_RUN_REGEX = re.compile(r"[\x00-\x7f]+")
+
+
+class SearchMatcher:
+    """The include and exclude words of a search, prepared once to be checked against every memo.
+
+    A word that is a part of another word occurs wherever that word occurs, so:
+
+    - only the include words that are not a part of another include word have to be searched for;
+    - only the exclude words that do not contain another exclude word have to be searched for;
+    - `find` searches the longest words first and marks the words they contain as found without searching.
+
+    Every search is a C-level substring search, which is faster than a single pass of an automaton in Python.
+    """
+
+    def __init__(self, include=(), exclude=()) -> None:
+        """Prepare the words of a search.
+
+        Args:
+            include: The words the texts must contain.
+            exclude: The words the texts must not contain.
+        """
+        self.include = tuple(dict.fromkeys(include))
+        self.exclude = tuple(dict.fromkeys(exclude))
+        words = set(self.include) | set(self.exclude)
+        # every word with the words it contains (itself included)
+        self._parts = {word: {part for part in words if part in word} for word in words}
+        self._find_order = sorted(words, key=len, reverse=True)
+        # the longest include words first: they are the least likely to occur, a mismatch is found early
+        self._include_order = sorted(
+            (word for word in self.include if not any(word != other and word in other for other in self.include)),
+            key=len,
+            reverse=True,
+        )
+        self._exclude_order = [
+            word for word in self.exclude if not any(word != other and other in word for other in self.exclude)
+        ]
+
+    def find(self, text) -> set:
+        """Get the include and exclude words that occur in the text."""
+        found = set()
+        for word in self._find_order:
+            if word not in found and word in text:
+                found |= self._parts[word]
+        return found
+
+    def matches(self, text) -> bool:
+        """Check if the text contains all the include words and none of the exclude words.
+
+        The check stops at the first mismatch.
+        """
+        return all(word in text for word in self._include_order) and not any(
+            word in text for word in self._exclude_order
+        )
+
+
+class BytesSearchMatcher:
+    """A `SearchMatcher` for the raw UTF-8 content of memos, which is decoded only if a match needs confirming.
+
+    The words are searched as lowercased UTF-8 patterns in the content lowercased by `bytes.lower`,
+    which changes only the ASCII letters and takes one copy instead of a decode and a `str.lower`.
+    A word found there is in the lowercased text too (`str.lower` is idempotent).
+    An ASCII word not found there is not in the lowercased text either,
+    unless the content has one of the `ASCII_LOWERING_CHARACTERS`.
+    A non-ASCII word may be in the content in uppercase: if the ASCII parts of the word are in the content,
+    the content is decoded to confirm.
+
+    The content of a large memo can be a memory map: it is scanned in place, without a lowered copy,
+    by regular expressions with `re.IGNORECASE`, which also ignore the case of the ASCII letters only.
+    """
+
+    def __init__(self, matcher: SearchMatcher) -> None:
+        """Prepare the words of a search for raw UTF-8 contents.
+
+        Args:
+            matcher: The matcher of the lowercased words.
+        """
+        self._matcher = matcher
+        words = dict.fromkeys(matcher.include + matcher.exclude)
+        self._patterns = {word: word.encode("utf-8") for word in words}
+        self._ascii_parts = {word: [part.encode("ascii") for part in ASCII_RUN_REGEX.findall(word)] for word in words}
+        # the part of the content a word may span from the end of the name
+        self._head_size = max((len(pattern) for pattern in self._patterns.values()), default=0)
+        self._regexes = {}  # pattern -> case-insensitive regex, compiled for memory-mapped contents only
+
+    def _get_regex(self, pattern: bytes):
+        """Get the case-insensitive regex of a pattern."""
+        regex = self._regexes.get(pattern)
+        if regex is None:
+            regex = self._regexes[pattern] = re.compile(re.escape(pattern), re.IGNORECASE)
+        return regex
+
+    def _get_lookup(self, name: str, data):
+        """Get a callable that looks up a word in the text (name and content) of a memo.
+
+        The callable returns True if the text has the word, False if it does not,
+        or None if the content has to be decoded to know it.
+        """
+        if isinstance(data, bytes):
+            content = data.lower()
+            head = name.lower().encode("utf-8") + content[: self._head_size]
+            is_exact = data.isascii() or not any(character in data for character in ASCII_LOWERING_CHARACTERS)
+
+            def contains(pattern):
+                return pattern in content or pattern in head
+
+        else:  # a memory map
+            head = name.lower().encode("utf-8") + data[: self._head_size].lower()
+            is_exact = all(data.find(character) < 0 for character in ASCII_LOWERING_CHARACTERS)
+
+            def contains(pattern):
+                return pattern in head or self._get_regex(pattern).search(data) is not None
+
+        def lookup(word):
+            if contains(self._patterns[word]):
+                return True
+            if not is_exact:
+                return None
+            if word.isascii() or not all(contains(part) for part in self._ascii_parts[word]):
+                return False
+            return None
+
+        return lookup
+
+    def _decode(self, name: str, data) -> str:
+        """Get the lowercased text of a memo, as searched by `SearchMatcher`."""
+        return (name + (data if isinstance(data, bytes) else data[:]).decode("utf-8", errors="replace")).lower()
+
+    def matches(self, name: str, data) -> bool:
+        """Check if a memo has all the include words and none of the exclude words.
+
+        Args:
+            name: The name of the memo.
+            data: The raw content of the memo, `bytes` or a memory map.
+
+        Returns:
+            True if the memo matches.
+        """
+        lookup = self._get_lookup(name, data)
+        is_decided = True
+        for word in self._matcher.include:
+            is_found = lookup(word)
+            if is_found is False:
+                return False
+            is_decided &= is_found is not None
+        for word in self._matcher.exclude:
+            is_found = lookup(word)
+            if is_found:
+                return False
+            is_decided &= is_found is not None
+        return is_decided or self._matcher.matches(self._decode(name, data))
+
+    def find(self, name: str, data) -> set:
+        """Get the include and exclude words that occur in a memo.
+
+        Args:
+            name: The name of the memo.
+            data: The raw content of the memo, `bytes` or a memory map.
+
+        Returns:
+            The set of the words.
+        """
+        lookup = self._get_lookup(name, data)
+        found = set()
+        for word in self._patterns:
+            is_found = lookup(word)
+            if is_found is None:
+                return self._matcher.find(self._decode(name, data))
+            if is_found:
+                found.add(word)
+        return found
@@ -1,8 +1,16 @@
 """Memo."""
 
 
+import re
 from datetime import datetime
 
+from utils import get_domain_name_from_url, normalize_url, validate_url
+
+HEADING_REGEX = re.compile(r"^#{1,6}\s+(.*)$")
+LINK_REGEX = re.compile(r"^\[.*\]\((\S+)\)$")
+DATE_HASHTAG_REGEX = re.compile(r"^#(\d{4}-\d{2}-\d{2})$")
+SEPARATOR_LINE = "\n----\n"
+
 
 class Memo:
     """Memo."""
@@ -108,3 +116,107 @@ class Memo:
             The current date as a hashtag.
         """
         return datetime.now().strftime("#%Y-%m-%d")  # noqa: DTZ005
+
+    @staticmethod
+    def parse_title(markdown: str) -> str:
+        """Get the title of a memo from its markdown.
+
+        The title is the heading written by `get_markdown` (it may follow a link line),
+        otherwise the first non-empty line of the memo.
+
+        Args:
+            markdown: The markdown of the memo.
+
+        Returns:
+            The title of the memo or an empty string.
+        """
+        lines = [line.strip() for line in markdown.splitlines() if line.strip()]
+        for line in lines[:2]:
+            match = HEADING_REGEX.match(line)
+            if match:
+                return match.group(1).strip()
+        return lines[0] if lines else ""
+
+    @staticmethod
+    def parse_hashtags(markdown: str) -> set[str]:
+        """Get the hashtags of a memo from the footer written by `get_markdown`.
+
+        Args:
+            markdown: The markdown of the memo.
+
+        Returns:
+            The hashtags of the memo.
+        """
+        _head, separator, footer = markdown.rpartition(SEPARATOR_LINE)
+        words = footer.split()
+        if not separator or not words:
+            return set()
+        if not all(word.startswith("#") and len(word) > 1 for word in words):
+            return set()
+        return set(words)
+
+    @staticmethod
+    def get_date_from_hashtags(hashtags) -> str | None:
+        """Get the date of a memo from its date hashtags (see `get_current_date_hashtag`).
+
+        Args:
+            hashtags: The hashtags of the memo.
+
+        Returns:
+            The earliest date as "YYYY-MM-DD" or None if the memo has no date hashtag.
+        """
+        dates = [match.group(1) for match in map(DATE_HASHTAG_REGEX.match, hashtags) if match]
+        return min(dates, default=None)
+
+    @staticmethod
+    def parse_link(markdown: str) -> str:
+        """Get the link of a memo from the first line written by `get_markdown`.
+
+        Args:
+            markdown: The markdown of the memo.
+
+        Returns:
+            The link of the memo or an empty string.
+        """
+        first_line = markdown.lstrip().partition("\n")[0].strip()
+        match = LINK_REGEX.match(first_line)
+        link = match.group(1) if match else first_line
+        return link if validate_url(link) else ""
+
+    @staticmethod
+    def parse_domain(markdown: str) -> str:
+        """Get the domain name of the normalized link of a memo (see `parse_link`) or an empty string."""
+        return get_domain_name_from_url(normalize_url(Memo.parse_link(markdown)))
+
+
+class MemoRecord:
+    """What the memo list shows of a memo: its name, file stat, title, hashtags and link domain.
+
+    Records are kept for every memo of a memo book, so they have `__slots__` instead of a `__dict__`.
+    """
+
+    __slots__ = ("domain", "hashtags", "mtime_ns", "name", "size", "title")
+
+    def __init__(
+        self, name: str, mtime_ns: int = 0, size: int = 0, title: str = "", hashtags: tuple = (), domain: str = ""
+    ) -> None:
+        """Create a memo record.
+
+        Args:
+            name: The name of the memo.
+            mtime_ns: The modification time of the memo file in nanoseconds, 0 if it is not known yet.
+            size: The size of the memo file in bytes.
+            title: The title of the memo.
+            hashtags: The sorted hashtags of the memo.
+            domain: The domain name of the link of the memo.
+        """
+        self.name = name
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.title = title
+        self.hashtags = hashtags
+        self.domain = domain
+
+    def __repr__(self):
+        """Return the representation of the record."""
+        return f"MemoRecord({self.name!r})"
@@ -1,15 +1,54 @@
 """A memo book."""
 
+import bisect
+import contextlib
+import mmap
+import os
+import re
+import sys
+import threading
+import time
 from datetime import datetime
 from gettext import gettext as _
 from pathlib import Path
 
-from memo import Memo
-from templates import memo_template
-from utils import HTML2MarkdownParser, Settings
+from cache import DiskCache, LRUCache
+from catalog import CatalogView, MemoCatalog
+from index import INDEX_FILE_NAME, MemoIndex, get_content_hash, tokenize
+from indexer import build_index
+from matcher import BytesSearchMatcher, SearchMatcher
+from memo import Memo, MemoRecord
+from query import (
+    FIELD_DATE,
+    FIELD_DOMAIN,
+    FIELD_NAME,
+    FIELD_TAG,
+    FIELD_TEXT,
+    And,
+    Not,
+    Term,
+    get_search_words,
+    get_terms,
+    parse_query,
+)
+from ranking import get_bm25_scores, get_boost, order_by_score
+from templates import RENDERER_VERSION, memo_template
+from utils import HTML2MarkdownParser, Settings, get_domain_name_from_url, normalize_url, read_memo_text
+from watcher import MEMO_MOVED, MEMO_RESCAN, MemoBookWatcher
 
 MAX_FILENAME_LENGTH = 200
 MEMO_EXTENSION = ".md"
+CACHE_DIR_NAME = ".cache"
+
+SEARCH_BACKEND_SCAN = "scan"  # read every memo file
+SEARCH_BACKEND_INDEX = "index"  # trigram and token index, same results as the scan
+SEARCH_BACKEND_FTS5 = "fts5"  # SQLite FTS5: ranked (bm25) prefix search
+SEARCH_BACKENDS = (SEARCH_BACKEND_SCAN, SEARCH_BACKEND_INDEX, SEARCH_BACKEND_FTS5)
+SEARCH_CACHE_SIZE = 16  # number of recent search results kept for search-as-you-type
+# date:2026-01..2026-03, date:2026-05, after:2026-09-01, before:2026 (a date is a year, a month or a day)
+DATE_TERM_REGEX = re.compile(r"^(date|after|before):(\d{4}(?:-\d{2}){0,2})?(\.\.)?(\d{4}(?:-\d{2}){0,2})?$")
+DATE_MAX = "~"  # sorts after any "YYYY-MM-DD" date
+RANKED_RESULTS = 100  # the number of the best search results ordered by score, unless given
 
 
 DEFAULT_MEMOBOOK_SETTINGS = {
@@ -19,6 +58,13 @@ DEFAULT_MEMOBOOK_SETTINGS = {
     "include_bookmark_content": True,
     "html_parser_include_links": False,
     "html_parser_include_images": False,
+    "search_backend": SEARCH_BACKEND_INDEX,
+    "content_cache_size_mb": 32,  # memory budget for the markdown and HTML of recently viewed memos
+    "html_cache_size_mb": 64,  # disk budget for the rendered HTML of memos
+    "prefetch_size_mb": 8,  # memory budget for the memos rendered ahead of the list navigation
+    "columnar_catalog": False,  # list memos from a compact catalog instead of a record per memo, for huge memo books
+    "large_memo_size_kb": 1024,  # larger memos are searched through a memory map and previewed in parts
+    "preview_size_kb": 256,  # the part of a large memo previewed at first and added by every "load more"
 }
 
 
@@ -30,6 +76,94 @@ class MemoBook:
         self._path = path
         self._settings_path = path / ".settings"
         self.settings = Settings(self._settings_path)
+        self._index = None
+        self._index_lock = threading.RLock()
+        self._search_cache = LRUCache(max_items=SEARCH_CACHE_SIZE)
+        self._search_cache_version = 0
+        # markdown and rendered HTML keyed by (kind, name, mtime_ns, size), so a changed file is never served
+        self.content_cache = LRUCache(max_size=self._get_setting("content_cache_size_mb") * 1024 * 1024)
+        # rendered HTML keyed by the hash of the markdown and the renderer version, survives restarts
+        self.html_cache = DiskCache(
+            path / CACHE_DIR_NAME / "html",
+            max_size=self._get_setting("html_cache_size_mb") * 1024 * 1024,
+            suffix=".html",
+        )
+        self._name_keys = None  # sorted lowercased memo names, for the name-prefix search
+        self._names = None  # memo names in the order of `_name_keys`
+        self._date_keys = None  # sorted "YYYY-MM-DD" dates of the memos, for the date search
+        self._date_names = None  # memo names in the order of `_date_keys`
+        self._records = None  # memo records by name, sorted by name, loaded from the index
+        self._catalog = None  # the columnar catalog of the memos, if enabled
+        self._watcher = None
+        self._build_lock = threading.Lock()
+        self._is_closing = False
+
+    @property
+    def index(self) -> MemoIndex:
+        """The index of the memo book.
+
+        It is opened on first access and reconciled with the memo files (see `_reconcile_index`).
+        A new index is empty until `build_index` is called.
+
+        Raises:
+            RuntimeError: If the memo book is closed, e.g. for a search thread that outlived it.
+        """
+        with self._index_lock:
+            if self._index is None:
+                if self._is_closing:
+                    raise RuntimeError("The memo book is closed.")
+                self._index = MemoIndex(
+                    self._path / INDEX_FILE_NAME, full_text_search=self.search_backend == SEARCH_BACKEND_FTS5
+                )
+                if not self._index.is_new:
+                    self._reconcile_index()
+        return self._index
+
+    @property
+    def is_index_built(self) -> bool:
+        """Check if the index is built, until then memos are listed and searched by scanning the directory."""
+        return not self.index.is_new
+
+    def build_index(self, on_progress=None) -> bool:
+        """Build the index of the memo book if it is new, using a process pool for large memo books.
+
+        Meanwhile the memo book can be used, see `is_index_built`.
+
+        Args:
+            on_progress: Optional callable that gets the number of indexed memos and the total number of memos.
+
+        Returns:
+            True if the index is built, False if the memo book was closed during the build.
+        """
+        with self._build_lock:
+            if self._is_closing:
+                return False
+            index = self.index
+            if not index.is_new:
+                return True
+            is_built = build_index(
+                index,
+                self._path,
+                self._scan_memo_names(),
+                MEMO_EXTENSION,
+                on_progress=on_progress,
+                is_cancelled=lambda: self._is_closing,
+            )
+            if not is_built:
+                return False
+            index.mark_built()
+            self._reconcile_index()  # catch up with the changes made during the build
+            self._invalidate_search_cache()
+            return True
+
+    def close(self) -> None:
+        """Stop watching the memo book, cancel the index build and close the index."""
+        self._is_closing = True
+        self.stop_watching()
+        with self._build_lock, self._index_lock:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
 
     @property
     def path(self) -> Path:
@@ -46,10 +180,206 @@ class MemoBook:
         """Check if the memo book is protected."""
         return self.settings["is_protected"]
 
+    def _get_setting(self, key: str):
+        """Get a setting of the memo book or its default value if the settings file has no such key."""
+        return self.settings[key] if key in self.settings else DEFAULT_MEMOBOOK_SETTINGS[key]
+
+    @property
+    def search_backend(self) -> str:
+        """The search backend of the memo book, one of `SEARCH_BACKENDS`."""
+        backend = self._get_setting("search_backend")
+        return backend if backend in SEARCH_BACKENDS else DEFAULT_MEMOBOOK_SETTINGS["search_backend"]
+
     def _get_memo_path(self, name: str) -> Path:
         """Get the path to a memo."""
         return self._path / f"{name}{MEMO_EXTENSION}"
 
+    ########################################
+    # Index
+    ########################################
+
+    def _index_memo(self, name: str, markdown: str | None = None, stat: os.stat_result | None = None) -> None:
+        """Add a memo to the index or update it.
+
+        The stat is taken before the file is read: if the file changes meanwhile, the stored stat is stale
+        and the memo is reindexed on the next refresh, instead of the new stat being stored with the old content.
+
+        Args:
+            name: The name of the memo.
+            markdown: The markdown of the memo. If None, it is read from the file.
+            stat: The stat of the memo file taken before `markdown` was read, if known.
+        """
+        memo_path = self._get_memo_path(name)
+        if stat is None:
+            stat = memo_path.stat()
+        if markdown is None:
+            markdown = read_memo_text(memo_path)
+        self.index.upsert(
+            name,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            title=Memo.parse_title(markdown),
+            hashtags=Memo.parse_hashtags(markdown),
+            domain=Memo.parse_domain(markdown),
+            link=normalize_url(Memo.parse_link(markdown)),
+            content=markdown,
+        )
+        # after the change, so a search running meanwhile cannot cache a result of the old index
+        self._invalidate_search_cache()
+
+    def _invalidate_search_cache(self) -> None:
+        """Forget the cached search results, the memo book has changed."""
+        self._search_cache_version += 1
+        self._search_cache.clear()
+        self._name_keys = None
+        self._names = None
+        self._date_keys = None
+        self._date_names = None
+        self._records = None
+        self._catalog = None
+
+    def _refresh_memo(self, name: str, stat: os.stat_result | None = None, force: bool = False) -> bool:
+        """Update the index of a memo that may have been changed by another program.
+
+        The file is read only if its stat differs from the indexed one,
+        and reindexed only if the hash of its content differs too. A file that cannot be read
+        (e.g. without permission) is indexed by its name and stat only, until it changes again.
+
+        Args:
+            name: The name of the memo.
+            stat: The stat of the memo file, if known.
+            force: If True, reindex the memo even if it is unchanged.
+
+        Returns:
+            True if the memo has been reindexed or deleted from the index.
+        """
+        entry = self.index.get_manifest_entry(name)
+        memo_path = self._get_memo_path(name)
+        try:
+            stat = stat or memo_path.stat()
+            if not force and entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                return False
+            markdown = read_memo_text(memo_path)
+        except FileNotFoundError:
+            if entry is None:
+                return False
+            self.index.delete(name)
+            return True
+        except OSError:
+            if stat is None:
+                return False
+            markdown = ""
+        if not force and entry is not None and entry[2] == get_content_hash(markdown):
+            self.index.update_stat(name, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            return False
+        self._index_memo(name, markdown, stat)
+        return True
+
+    def apply_external_changes(self, changes) -> bool:
+        """Update the index with the changes of the memo files made by other programs.
+
+        Changes made by the memo book itself are already indexed and are skipped.
+
+        Args:
+            changes: A list of `(action, name, new_name)` tuples, see `watcher.MemoBookWatcher`.
+
+        Returns:
+            True if the index has changed.
+        """
+        is_changed = False
+        for action, name, new_name in changes:
+            if action == MEMO_RESCAN:
+                is_changed |= self._reconcile_index()
+                continue
+            if action != MEMO_MOVED:
+                is_changed |= self._refresh_memo(name)
+                continue
+            if self.index.get_manifest_entry(name) is None or self.index.get_manifest_entry(new_name) is not None:
+                is_changed |= self._refresh_memo(name)
+                is_changed |= self._refresh_memo(new_name)
+                continue
+            self.index.rename(name, new_name)
+            self._refresh_memo(new_name, force=True)  # the name is part of the searchable text
+            is_changed = True
+        if is_changed:
+            self._invalidate_search_cache()
+        return is_changed
+
+    def watch(self, on_change) -> None:
+        """Start watching the memo book directory for changes made by other programs.
+
+        The changes are applied to the index incrementally.
+
+        Args:
+            on_change: Callable without arguments, called from the watcher thread after the index has changed.
+        """
+        self.stop_watching()
+
+        def on_changes(changes):
+            if self.apply_external_changes(changes):
+                on_change()
+
+        self._watcher = MemoBookWatcher(self._path, MEMO_EXTENSION, on_changes)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        """Stop watching the memo book directory."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _scan_memo_names(self) -> list:
+        """Get the names of all memo files with one `os.scandir` pass."""
+        with os.scandir(self._path) as entries:
+            return [
+                entry.name[: -len(MEMO_EXTENSION)]
+                for entry in entries
+                if entry.name.endswith(MEMO_EXTENSION) and entry.is_file()
+            ]
+
+    def _get_names(self) -> list:
+        """Get the sorted names of all memos, from the index if it is built."""
+        if self.is_index_built:
+            return self.index.get_names()
+        return sorted(self._scan_memo_names())
+
+    def _reconcile_index(self) -> bool:
+        """Bring the index up to date with the memo files after the memo book was closed.
+
+        One `os.scandir` pass compares the stat of every memo file with the indexed manifest
+        (see `MemoIndex.get_manifest`); only new and changed files are read. The pass stops early when
+        the memo book is being closed, the next one catches up.
+
+        Returns:
+            True if the index has changed.
+        """
+        manifest = self._index.get_manifest()
+        is_changed = False
+        with self._index.batch():
+            with os.scandir(self._path) as entries:
+                for entry in entries:
+                    if self._is_closing:
+                        return is_changed
+                    if not entry.name.endswith(MEMO_EXTENSION) or not entry.is_file():
+                        continue
+                    name = entry.name[: -len(MEMO_EXTENSION)]
+                    manifest_entry = manifest.pop(name, None)
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:  # deleted meanwhile
+                        if manifest_entry:
+                            manifest[name] = manifest_entry
+                        continue
+                    if manifest_entry and manifest_entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    is_changed |= self._refresh_memo(name, stat=stat)
+            for name in manifest:  # deleted files
+                self._index.delete(name)
+                is_changed = True
+        if is_changed:
+            self._invalidate_search_cache()
+        return is_changed
+
     ########################################
     # Memos
     ########################################
@@ -68,7 +398,9 @@ class MemoBook:
     def _add_memo_from_object(self, memo_object: Memo, name: str) -> str:
         """Add a memo from an object."""
         memo_path = self._get_memo_path(self._make_unique_filename(name))
-        memo_path.write_text(memo_object.get_markdown(), encoding="utf-8")
+        markdown = memo_object.get_markdown()
+        memo_path.write_text(markdown, encoding="utf-8")
+        self._index_memo(memo_path.stem, markdown)
         return memo_path.stem
 
     def add_memo(self, content: str, name: str = "") -> str:
@@ -138,6 +470,7 @@ class MemoBook:
         if not memo_path.exists():
             return None
         memo_path.write_text(markdown, encoding="utf-8")
+        self._index_memo(name, markdown)
         return name
 
     def rename_memo(self, old_name: str, new_name: str) -> str:
@@ -158,23 +491,126 @@ class MemoBook:
             raise FileNotFoundError(f"Memo '{old_name}' not found.")
         new_memo_path = self._get_memo_path(self._make_unique_filename(new_name))
         old_memo_path.rename(new_memo_path)
+        self.index.rename(old_name, new_memo_path.stem)
+        self._index_memo(new_memo_path.stem)  # the name is part of the searchable text, invalidates the cache
         return new_memo_path.stem
 
+    def _get_cached_content(self, kind: str, name: str, load):
+        """Get the markdown or HTML of a memo from the content cache, loading it on a miss.
+
+        Args:
+            kind: "markdown" or "html".
+            name: The name of the memo.
+            load: Callable that loads the value if it is not cached.
+
+        Returns:
+            The cached or loaded value.
+        """
+        stat = self._get_memo_path(name).stat()
+        key = (kind, name, stat.st_mtime_ns, stat.st_size)
+        value = self.content_cache.get(key)
+        if value is None:
+            value = load()
+            self.content_cache.put(key, value)
+        return value
+
     def get_memo_markdown(self, name: str) -> str:
         """Get the content (markdonw) of a memo."""
-        return self._get_memo_path(name).read_text(encoding="utf-8")
+        return self._get_cached_content("markdown", name, lambda: self._get_memo_path(name).read_text(encoding="utf-8"))
+
+    def find_memos_by_link(self, url: str) -> list:
+        """Find the memos with a link to the given URL, compared normalized (see `utils.normalize_url`).
+
+        Args:
+            url: The URL.
+
+        Returns:
+            The names of the memos, sorted. Until the index is built, every memo is read to find them.
+        """
+        link = normalize_url(url)
+        if not link:
+            return []
+        if not self.is_index_built:
+            return [
+                name
+                for name in self._get_names()
+                if normalize_url(Memo.parse_link(read_memo_text(self._get_memo_path(name)))) == link
+            ]
+        return self.index.find_link(link)
+
+    def find_memos_by_domain(self, url_or_domain: str) -> list:
+        """Find the memos with a link to the domain of the given URL or to the given domain.
+
+        Args:
+            url_or_domain: The URL or the domain name.
+
+        Returns:
+            The names of the memos, sorted. Until the index is built, every memo is read to find them.
+        """
+        if "://" not in url_or_domain:
+            url_or_domain = f"https://{url_or_domain}"
+        domain = get_domain_name_from_url(normalize_url(url_or_domain))
+        if not domain:
+            return []
+        if not self.is_index_built:
+            return [
+                name
+                for name in self._get_names()
+                if Memo.parse_domain(read_memo_text(self._get_memo_path(name))) == domain
+            ]
+        return self.index.find_domain(domain)
 
     def get_memos_file_names(self) -> list:
         """Get the file names of all memos in the memo book."""
-        return [file.name for file in self._path.glob(f"*{MEMO_EXTENSION}")]
+        return [f"{name}{MEMO_EXTENSION}" for name in self._get_names()]
 
-    def get_memos(self) -> list:
-        """Get all memos in the memo book as dicts.
+    def _get_records(self) -> dict:
+        """Get the records of all memos by name, sorted by name.
+
+        The records are loaded from the index once and kept until the memo book changes.
+        Until the index is built, the records have only the names.
+        """
+        records = self._records
+        if records is None:
+            if not self.is_index_built:
+                return {name: MemoRecord(name) for name in self._get_names()}
+            records = {row[0]: MemoRecord(*row) for row in self.index.get_memos()}
+            self._records = records
+        return records
+
+    def _get_records_of(self, names):
+        """Get the records of the memos with the given names, in the same order.
 
         Returns:
-            A list of dicts with the following keys: "name".
+            A list of `MemoRecord` or, if the columnar catalog is enabled, a `CatalogView`.
         """
-        return [{"name": file.stem} for file in self._path.glob(f"*{MEMO_EXTENSION}")]
+        if self._get_setting("columnar_catalog"):
+            catalog = self._get_catalog()
+            return CatalogView(catalog, catalog.get_rows(names))
+        records = self._get_records()
+        return [records.get(name) or MemoRecord(name) for name in names]
+
+    def _get_catalog(self) -> MemoCatalog:
+        """Get the columnar catalog of the memos, built from the index once and kept until the memo book changes.
+
+        Until the index is built, the catalog has only the names.
+        """
+        catalog = self._catalog
+        if catalog is None:
+            if not self.is_index_built:
+                return MemoCatalog((name, 0, 0, "", (), "") for name in self._get_names())
+            catalog = self._catalog = MemoCatalog(self.index.get_memos())
+        return catalog
+
+    def get_memos(self):
+        """Get all memos in the memo book.
+
+        Returns:
+            A list of `MemoRecord` sorted by name or, if the columnar catalog is enabled, a `CatalogView`.
+        """
+        if self._get_setting("columnar_catalog"):
+            return CatalogView(self._get_catalog())
+        return list(self._get_records().values())
 
     def is_memo_matches_search(self, name: str, include=None, exclude=None, quick_search: bool = True) -> bool:
         """Check if a memo matches the search.
@@ -188,36 +624,524 @@ class MemoBook:
         Returns:
             True if the memo matches the search, False otherwise.
         """
-        text = name
-        if not quick_search:
-            text += (self._path / f"{name}{MEMO_EXTENSION}").read_text(encoding="utf-8")
-        text = text.lower()
-        if include:
-            for word in include:
-                if word not in text:
-                    return False
-        if exclude:
-            for word in exclude:
-                if word in text:
-                    return False
-        return True
+        matcher = SearchMatcher(include or (), exclude or ())
+        if quick_search:
+            return matcher.matches(name.lower())
+        with self._open_memo_bytes(name) as data:
+            return BytesSearchMatcher(matcher).matches(name, data)
 
-    def search(self, include=None, exclude=None, quick_search: bool = True) -> list:
+    def _is_large_memo(self, size: int) -> bool:
+        """Check if a memo of the given size in bytes is large (see the `large_memo_size_kb` setting)."""
+        return size > self._get_setting("large_memo_size_kb") * 1024
+
+    @contextlib.contextmanager
+    def _open_memo_bytes(self, name: str):
+        """Open the raw content of a memo for a search, it is decoded only if a match needs confirming.
+
+        A large memo is memory-mapped instead of read, so the search scans its pages in place.
+
+        Yields:
+            The content as `bytes` or, for a large memo, as a read-only `mmap.mmap`.
+        """
+        with self._get_memo_path(name).open("rb") as file:
+            if not self._is_large_memo(os.fstat(file.fileno()).st_size):
+                yield file.read()
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield data
+
+    def search(self, include=None, exclude=None, quick_search: bool = True, is_cancelled=None) -> list:
         """Search memos in the memo book.
 
+        A full search is dispatched to the search backend set in the memo book settings.
+        The FTS5 backend falls back to the index if SQLite has no FTS5.
+        The results of recent searches are cached until the memo book changes;
+        a search that refines a cached one (see `_is_search_refinement`) only checks the cached result.
+
         Args:
             include: The words to include in the search.
             exclude: The words to exclude from the search.
             quick_search: If True, search only in the file names.
+            is_cancelled: Optional callable checked while reading memo files.
+                If it returns True, the search stops and the (incomplete) result must be discarded.
 
         Returns:
-            A list of dicts with the following keys: "name".
+            A list of `MemoRecord` or a `CatalogView`, see `get_memos`.
         """
-        return [
-            {"name": file.stem}
-            for file in self._path.glob(f"*{MEMO_EXTENSION}")
-            if self.is_memo_matches_search(file.stem, include=include, exclude=exclude, quick_search=quick_search)
-        ]
+        return self._get_records_of(self._search_cached(include, exclude, quick_search, is_cancelled))
+
+    def search_ranked(self, include=None, exclude=None, is_cancelled=None, top_k: int = RANKED_RESULTS) -> tuple:
+        """Search memos in the memo book (see `search`) and order the result by relevance.
+
+        The score of a memo is its BM25 score for the include words, computed from the index postings,
+        plus boosts for the include words in its name and title and for its recency (see `ranking`).
+        Only the `top_k` best memos are sorted by score, the others follow in the order of `search`.
+        Until the index is built the memos are scored by the boosts only.
+
+        Args:
+            include: The words to include in the search.
+            exclude: The words to exclude from the search.
+            is_cancelled: Optional callable, see `search`.
+            top_k: The number of the best memos to sort, e.g. the number of visible rows of a list.
+
+        Returns:
+            A tuple of the memos (a list of `MemoRecord` or a `CatalogView`) and their scores by memo name.
+        """
+        names = self._search_cached(include, exclude, False, is_cancelled)
+        words = [word for word in include or () if not self._parse_date_term(word)]
+        return self._rank_names(names, words, is_cancelled, top_k)
+
+    def search_query(self, query: str, is_cancelled=None, top_k: int = RANKED_RESULTS) -> tuple:
+        """Search memos with a query of the query language (see `query`) and order the result by relevance.
+
+        A query that is a conjunction of words, hashtags and dates is searched by `search_ranked`,
+        with its cache and search backends, any other query by a plan (see `_run_query_plan`).
+        The memos are scored for the terms of the query that are not negated, like by `search_ranked`.
+
+        Args:
+            query: The query.
+            is_cancelled: Optional callable, see `search`.
+            top_k: The number of the best memos to sort, e.g. the number of visible rows of a list.
+
+        Returns:
+            A tuple of the memos (a list of `MemoRecord` or a `CatalogView`) and their scores by memo name.
+            An empty query gives all the memos, not scored.
+        """
+        node = parse_query(query)
+        if node is None:
+            return self.get_memos(), {}
+        words = get_search_words(node)
+        if words is not None:
+            return self.search_ranked(*words, is_cancelled=is_cancelled, top_k=top_k)
+        names = self._run_query_plan(node, is_cancelled or (lambda: False))
+        words = [term.value for term, is_negated in get_terms(node) if not is_negated and term.field != FIELD_DATE]
+        return self._rank_names(names, list(dict.fromkeys(words)), is_cancelled, top_k)
+
+    def _rank_names(self, names, words, is_cancelled, top_k: int) -> tuple:
+        """Score the found memos for the search words and order them by score (see `search_ranked`).
+
+        The term statistics are read for the found memos only, one term at a time,
+        so a search without results costs nothing and a cancelled one stops between the terms.
+
+        Returns:
+            A tuple of the memos and their scores by memo name, not scored without words or results.
+        """
+        is_cancelled = is_cancelled or (lambda: False)
+        if not names or not words or is_cancelled():
+            return self._get_records_of(names), {}
+        scores = dict.fromkeys(names, 0.0)
+        if self.is_index_built:
+            statistics = []
+            for term in dict.fromkeys(term for word in words for term in tokenize(word)):
+                if is_cancelled():
+                    return self._get_records_of(names), {}
+                statistics.append(self.index.get_term_statistics(term, names))
+            bm25_scores = get_bm25_scores(*self.index.get_length_statistics(), statistics)
+            for name in names:
+                scores[name] = bm25_scores.get(name, 0.0)
+        now_ns = time.time_ns()
+        for record in self._get_records_of(names):
+            scores[record.name] += get_boost(words, record.name, record.title, record.mtime_ns, now_ns)
+        return self._get_records_of(order_by_score(names, scores, top_k)), scores
+
+    def _run_query_plan(self, node, is_cancelled) -> list:
+        """Search memos with a parsed query (see `query.parse_query`).
+
+        Every part of the query is evaluated to the memos that surely match it and the memos that may match it:
+
+        - a `name:` term is matched against the memo names in memory;
+        - `tag:`, `domain:` and `date:` terms are exact lookups of the index and of the date index,
+          until the index is built (or with the scan backend) tags and domains are searched in the text;
+        - a word or a phrase gives the candidates of the index (see `MemoIndex.find`), exact for some words,
+          all the memos without the index.
+
+        The parts of a group are evaluated from the cheapest, the exact lookups first (see `_get_query_cost`),
+        and the rest of a group is skipped as soon as no memo may match it.
+        Only the memos that may match the query but not surely are read, once each,
+        to find the words of the query in their text.
+
+        Args:
+            node: The root of the query.
+            is_cancelled: Callable checked before reading every memo.
+
+        Returns:
+            The sorted names of the matching memos.
+        """
+        plan = _QueryPlan(self, self.is_index_built and self.search_backend != SEARCH_BACKEND_SCAN)
+        sure, possible = plan.evaluate(node, plan.universe)
+        if possible - sure:
+            words = {self._get_term_word(term) for term, _is_negated in get_terms(node)} - {None}
+            matcher = BytesSearchMatcher(SearchMatcher(words))
+            for name in sorted(possible - sure):
+                if is_cancelled():
+                    break
+                with self._open_memo_bytes(name) as data:
+                    found = matcher.find(name, data)
+                if plan.is_match(node, name, found):
+                    sure.add(name)
+        return sorted(sure)
+
+    @staticmethod
+    def _get_term_word(term: Term):
+        """Get the word a query term is searched for in the text of memos or None if it is an exact lookup."""
+        if term.field in (FIELD_TEXT, FIELD_TAG):
+            return term.value
+        if term.field == FIELD_DATE:
+            return None if MemoBook._parse_date_term(term.value) else term.value
+        return None
+
+    @staticmethod
+    def _get_query_cost(node, use_index: bool) -> int:
+        """Get the cost of evaluating a part of a query: 0 for exact lookups only, 1 if it has memos to read.
+
+        Without the index, memos are read to find words and domains (see `find_memos_by_domain`).
+        """
+        return max(
+            MemoBook._get_term_word(term) is not None or (term.field == FIELD_DOMAIN and not use_index)
+            for term, _is_negated in get_terms(node)
+        )
+
+    def _look_up_term(self, term: Term, use_index: bool, universe: set) -> tuple:
+        """Look up the memos of a query term (see `_run_query_plan`).
+
+        Returns:
+            A tuple of the set of the names of the memos that surely have the term
+            and the set of the names of the memos that may have it.
+        """
+        word = self._get_term_word(term)
+        if word is None:
+            if term.field == FIELD_NAME:
+                names = {name for name in universe if term.value in name.lower()}
+            elif term.field == FIELD_DATE:
+                names = self._search_dates([self._parse_date_term(term.value)], [])
+            else:
+                names = set(self.find_memos_by_domain(term.value))
+            return names, names
+        if not use_index:
+            return set(), universe
+        names, is_exact = self.index.find(word)
+        if is_exact:
+            return names, names
+        tagged = self._find_tagged(word)
+        return tagged, names | tagged
+
+    def _search_cached(self, include, exclude, quick_search: bool, is_cancelled) -> list:
+        """Search the names of the memos, through the cache of recent searches (see `search`)."""
+        is_cancelled = is_cancelled or (lambda: False)
+        key = (tuple(include or ()), tuple(exclude or ()), quick_search)
+        names = self._search_cache.get(key)
+        if names is None:
+            version = self._search_cache_version
+            names = self._search_names(include, exclude, quick_search, is_cancelled, within=self._get_search_base(key))
+            # do not cache incomplete results or results of a memo book that has changed meanwhile
+            if not is_cancelled() and version == self._search_cache_version:
+                self._search_cache.put(key, names)
+        return names
+
+    def search_name_prefix(self, prefix: str) -> list:
+        """Search memos whose names start with the given prefix (case-insensitive).
+
+        This is a binary search over a sorted in-memory array of names, cheap enough for the first keystrokes.
+
+        Args:
+            prefix: The prefix of the memo names.
+
+        Returns:
+            A list of `MemoRecord` or a `CatalogView`, see `get_memos`.
+        """
+        names, keys = self._names, self._name_keys
+        if keys is None:
+            pairs = sorted((name.lower(), name) for name in self._get_names())
+            keys = [key for key, _name in pairs]
+            names = [name for _key, name in pairs]
+            self._names, self._name_keys = names, keys
+        prefix = prefix.lower()
+        start = bisect.bisect_left(keys, prefix)
+        end = start
+        while end < len(keys) and keys[end].startswith(prefix):
+            end += 1
+        return self._get_records_of(names[start:end])
+
+    @staticmethod
+    def _is_search_refinement(key, base_key) -> bool:
+        """Check if the results of a search are always a subset of the results of a base search.
+
+        It is so if every include word of the base search is a part of an include word of the search
+        and every exclude word of the base search contains an exclude word of the search.
+
+        Args:
+            key: The (include, exclude, quick_search) key of the search.
+            base_key: The (include, exclude, quick_search) key of the base search.
+
+        Returns:
+            True if the search refines the base search.
+        """
+
+        def is_part(part, word):
+            part_range, word_range = MemoBook._parse_date_term(part), MemoBook._parse_date_term(word)
+            if part_range or word_range:  # a date term is only a part of a date term with a narrower range
+                if not (part_range and word_range):
+                    return False
+                return part_range[0] <= word_range[0] <= word_range[1] <= part_range[1]
+            return part in word
+
+        include, exclude, quick_search = key
+        base_include, base_exclude, base_quick_search = base_key
+        return (
+            quick_search == base_quick_search
+            and all(any(is_part(base_word, word) for word in include) for base_word in base_include)
+            and all(any(is_part(word, base_word) for word in exclude) for base_word in base_exclude)
+        )
+
+    def _get_search_base(self, key):
+        """Get the smallest cached search result the given search refines.
+
+        Returns:
+            A list of memo names or None if there is no such search result.
+        """
+        bases = [names for base_key, names in self._search_cache.items() if self._is_search_refinement(key, base_key)]
+        return min(bases, key=len, default=None)
+
+    def _search_names(self, include, exclude, quick_search: bool, is_cancelled, within=None) -> list:
+        """Search memos in the memo book with the search backend.
+
+        A word starting with "#" is searched like any other word, so an inline "#todo" is found by every backend;
+        the hashtag postings of the index only spare reading the memos with a hashtag that starts with it
+        (see `_find_tagged`). FTS5 drops the "#" and every word without word characters (e.g. "++"), so such
+        words are searched through the index with that backend (see `_is_fts_unsearchable`).
+
+        Args:
+            include: The words to include in the search.
+            exclude: The words to exclude from the search.
+            quick_search: If True, search only in the file names.
+            is_cancelled: Callable checked while reading memo files.
+            within: If not None, search only among these memo names.
+
+        Returns:
+            The names of the matching memos.
+        """
+        backend = self.search_backend if self.is_index_built else SEARCH_BACKEND_SCAN
+        include = include or []
+        exclude = exclude or []
+        dates_include = [self._parse_date_term(word) for word in include]
+        dates_exclude = [self._parse_date_term(word) for word in exclude]
+        if not quick_search and any(dates_include + dates_exclude):
+            within = self._search_dates(filter(None, dates_include), filter(None, dates_exclude), within)
+            include = [word for word, date_range in zip(include, dates_include) if not date_range]
+            exclude = [word for word, date_range in zip(exclude, dates_exclude) if not date_range]
+        if quick_search or backend == SEARCH_BACKEND_SCAN:
+            names = []
+            matcher = SearchMatcher(include, exclude)
+            bytes_matcher = BytesSearchMatcher(matcher)
+            for name in self._get_names() if within is None else sorted(within):
+                if is_cancelled():
+                    break
+                if quick_search:
+                    is_match = matcher.matches(name.lower())
+                else:
+                    with self._open_memo_bytes(name) as data:
+                        is_match = bytes_matcher.matches(name, data)
+                if is_match:
+                    names.append(name)
+            return names
+        if backend == SEARCH_BACKEND_FTS5 and self.index.has_full_text_search:
+            index_include = [word for word in include if self._is_fts_unsearchable(word)]
+            index_exclude = [word for word in exclude if self._is_fts_unsearchable(word)]
+            if index_include or index_exclude:
+                within = self._search_index(
+                    include=index_include, exclude=index_exclude, is_cancelled=is_cancelled, within=within
+                )
+                include = [word for word in include if not self._is_fts_unsearchable(word)]
+                exclude = [word for word in exclude if not self._is_fts_unsearchable(word)]
+                if not include and not exclude:
+                    return within
+            names = self.index.search_full_text(include=include, exclude=exclude)
+            if within is None:
+                return names
+            within = set(within)
+            return [name for name in names if name in within]
+        return self._search_index(include=include, exclude=exclude, is_cancelled=is_cancelled, within=within)
+
+    @staticmethod
+    def _parse_date_term(word: str):
+        """Parse a date search term: `date:FROM..TO`, `date:PERIOD`, `after:PERIOD` or `before:PERIOD`.
+
+        A period is a year, a month or a day ("2026", "2026-01", "2026-01-31"), the bounds of `date:` are inclusive
+        and either of them can be omitted.
+
+        Args:
+            word: The search word.
+
+        Returns:
+            A (start, end) range of "YYYY-MM-DD" dates, `start <= date < end`, or None if the word is not a date term.
+        """
+        match = DATE_TERM_REGEX.match(word)
+        if not match:
+            return None
+        kind, first, is_range, last = match.groups()
+        if (kind != "date" and (is_range or last or not first)) or not (first or last):
+            return None
+        if kind == "after":
+            return first + DATE_MAX, DATE_MAX
+        if kind == "before":
+            return "", first
+        if not is_range:
+            if last:
+                return None
+            last = first
+        return first or "", last + DATE_MAX if last else DATE_MAX
+
+    def _get_date_index(self):
+        """Get the dates of the memos, sorted, and the memo names in the same order.
+
+        The date of a memo is its earliest date hashtag (see `Memo.get_date_from_hashtags`),
+        otherwise the date of its file modification. Until the index is built, it is always the latter.
+        """
+        keys, names = self._date_keys, self._date_names
+        if keys is not None:
+            return keys, names
+        if self.is_index_built:
+            memos = self.index.get_memos()
+            pairs = sorted(
+                (Memo.get_date_from_hashtags(hashtags) or self._get_mtime_date(mtime_ns), name)
+                for name, mtime_ns, _size, _title, hashtags, _domain in memos
+            )
+        else:
+            pairs = sorted(
+                (self._get_mtime_date(self._get_memo_path(name).stat().st_mtime_ns), name)
+                for name in self._scan_memo_names()
+            )
+        keys = [key for key, _name in pairs]
+        names = [name for _key, name in pairs]
+        if self.is_index_built:
+            self._date_keys, self._date_names = keys, names
+        return keys, names
+
+    @staticmethod
+    def _get_mtime_date(mtime_ns: int) -> str:
+        """Get the local date of a file modification time as "YYYY-MM-DD"."""
+        return datetime.fromtimestamp(mtime_ns / 1e9).strftime("%Y-%m-%d")  # noqa: DTZ006
+
+    def _search_dates(self, include, exclude, within=None) -> set:
+        """Search memos by their dates, bisecting the sorted dates (see `_get_date_index`).
+
+        Args:
+            include: The (start, end) date ranges the memos must be in.
+            exclude: The (start, end) date ranges the memos must not be in.
+            within: If not None, search only among these memo names.
+
+        Returns:
+            The set of the names of the matching memos.
+        """
+        keys, names = self._get_date_index()
+
+        def find(date_range):
+            start, end = date_range
+            return set(names[bisect.bisect_left(keys, start) : bisect.bisect_left(keys, end)])
+
+        found = None if within is None else set(within)
+        for date_range in include:
+            found = find(date_range) if found is None else found & find(date_range)
+        if found is None:
+            found = set(names)
+        for date_range in exclude:
+            found -= find(date_range)
+        return found
+
+    @staticmethod
+    def _is_hashtag(word: str) -> bool:
+        """Check if a search word is a hashtag."""
+        return len(word) > 1 and word.startswith("#")
+
+    @classmethod
+    def _is_fts_unsearchable(cls, word: str) -> bool:
+        """Check if FTS5 would search a word differently from the other backends: a hashtag or a word without tokens."""
+        return cls._is_hashtag(word) or not tokenize(word)
+
+    def _find_tagged(self, word: str) -> set:
+        """Find the memos that surely contain a search word because one of their hashtags starts with it.
+
+        Such memos need not be read to verify the word (see `MemoIndex.find_tag`).
+
+        Args:
+            word: The lowercased search word.
+
+        Returns:
+            The set of memo names, empty if the word is not a hashtag.
+        """
+        return self.index.find_tag(word) if self._is_hashtag(word) else set()
+
+    def _search_index(self, include=None, exclude=None, is_cancelled=None, within=None) -> list:
+        """Search memo names and contents through the inverted index.
+
+        The index gives the candidate memos; only the words the index cannot answer exactly
+        are verified, and only against the candidates, so the results are the same as of a full scan.
+
+        Args:
+            include: The words to include in the search.
+            exclude: The words to exclude from the search.
+            is_cancelled: Optional callable checked before reading every candidate memo.
+            within: If not None, search only among these memo names.
+
+        Returns:
+            The sorted names of the matching memos.
+        """
+        candidates = None
+        verify_include = {}  # word -> the names of the memos known to have it, they are not verified
+        verify_exclude = {}
+        for word in include or []:
+            names, exact = self.index.find(word)
+            if not exact:
+                verify_include[word] = self._find_tagged(word)
+                names = names | verify_include[word]
+            candidates = names if candidates is None else candidates & names
+        if within is not None:
+            candidates = set(within) if candidates is None else candidates & set(within)
+        if candidates is None:
+            candidates = set(self.index.get_names())
+        for word in exclude or []:
+            if not candidates:
+                break
+            names, exact = self.index.find(word)
+            if exact:
+                candidates -= names
+            else:
+                candidates -= self._find_tagged(word)
+                for name in names & candidates:
+                    verify_exclude.setdefault(name, []).append(word)
+        if verify_include or verify_exclude:
+            candidates = self._verify_candidates(candidates, verify_include, verify_exclude, is_cancelled)
+        return sorted(candidates)
+
+    def _verify_candidates(self, candidates, verify_include: dict, verify_exclude: dict, is_cancelled) -> list:
+        """Read the candidate memos of `_search_index` to verify the words the index cannot answer exactly.
+
+        Args:
+            candidates: The names of the candidate memos.
+            verify_include: The include words to verify, each with the names of the memos known to have it.
+            verify_exclude: The exclude words to verify by memo name.
+            is_cancelled: Optional callable checked before reading every candidate memo.
+
+        Returns:
+            The names of the verified memos.
+        """
+        verified = []
+        # one matcher for all the words to verify, it reports which of them every candidate contains
+        matcher = BytesSearchMatcher(
+            SearchMatcher(list(verify_include), {word for words in verify_exclude.values() for word in words})
+        )
+        for name in candidates:
+            words = [word for word, tagged in verify_include.items() if name not in tagged]
+            if not words and name not in verify_exclude:
+                verified.append(name)
+                continue
+            if is_cancelled and is_cancelled():
+                break
+            with self._open_memo_bytes(name) as data:
+                found = matcher.find(name, data)
+            if all(word in found for word in words) and not any(word in found for word in verify_exclude.get(name, ())):
+                verified.append(name)
+        return verified
 
     def delete_memo(self, name: str) -> str:
         """Delete a memo from the memo book.
@@ -232,6 +1156,8 @@ class MemoBook:
         if not memo_path.exists():
             return None
         memo_path.unlink()
+        self.index.delete(name)
+        self._invalidate_search_cache()
         return name
 
     def get_memo_html(self, name: str) -> str:
@@ -243,8 +1169,89 @@ class MemoBook:
         Returns:
             The renedered HTML of the memo.
         """
-        markdown = self._get_memo_path(name).read_text(encoding="utf-8")
-        return memo_template.render(markdown=markdown)
+        return memo_template.fill(self.get_memo_html_content(name))
+
+    def get_memo_html_content(self, name: str) -> str:
+        """Get the rendered content of a memo, without the page template.
+
+        Args:
+            name: The name of the memo.
+
+        Returns:
+            The rendered HTML content of the memo.
+        """
+        return self._get_cached_content("html", name, lambda: self._render_markdown(name))
+
+    def get_memo_preview(self, name: str, parts: int = 1) -> tuple:
+        """Get the rendered content of a memo for its preview, only the beginning of a large memo.
+
+        A large memo (see the `large_memo_size_kb` setting) is previewed by parts of `preview_size_kb`,
+        without reading the rest of it.
+
+        Args:
+            name: The name of the memo.
+            parts: The number of parts of a large memo to preview.
+
+        Returns:
+            The rendered HTML content and True if it is only the beginning of the memo.
+        """
+        size = parts * self._get_setting("preview_size_kb") * 1024
+        memo_size = self._get_memo_path(name).stat().st_size
+        if not self._is_large_memo(memo_size) or size >= memo_size:
+            return self.get_memo_html_content(name), False
+        content = self._get_cached_content(
+            f"preview {size}", name, lambda: memo_template.render_content(self._read_memo_head(name, size))
+        )
+        return content, True
+
+    def _read_memo_head(self, name: str, size: int) -> str:
+        """Read the beginning of a memo: at most `size` bytes, up to the end of the last whole line."""
+        with self._get_memo_path(name).open("rb") as file:
+            data = file.read(size)
+        end = data.rfind(b"\n") + 1
+        if end:
+            data = data[:end]
+        # without a line break the cut may split a character
+        return data.decode("utf-8", errors="ignore")
+
+    def prefetch_memos(self, names, is_cancelled=None) -> int:
+        """Read and render memos into the content cache ahead of their preview (see `get_memo_preview`).
+
+        The memos are prefetched in the given order until their markdown and HTML exceed the prefetch budget,
+        so the prefetching never pushes more than that out of the content cache.
+
+        Args:
+            names: The names of the memos, the most likely to be previewed first.
+            is_cancelled: Optional callable checked before every memo, the prefetching stops if it returns True.
+
+        Returns:
+            The number of prefetched memos.
+        """
+        budget = self._get_setting("prefetch_size_mb") * 1024 * 1024
+        size = 0
+        count = 0
+        for name in names:
+            if size >= budget or (is_cancelled is not None and is_cancelled()):
+                break
+            try:
+                content, is_partial = self.get_memo_preview(name)
+                size += sys.getsizeof(content)
+                if not is_partial:
+                    size += sys.getsizeof(self.get_memo_markdown(name))
+            except (FileNotFoundError, UnicodeDecodeError):
+                continue
+            count += 1
+        return count
+
+    def _render_markdown(self, name: str) -> str:
+        """Render the markdown of a memo to HTML, using the rendered HTML cache on disk."""
+        markdown = self.get_memo_markdown(name)
+        key = get_content_hash(f"{RENDERER_VERSION}\n{markdown}")
+        content = self.html_cache.get(key)
+        if content is None:
+            content = memo_template.render_content(markdown)
+            self.html_cache.put(key, content)
+        return content
 
     @staticmethod
     def make_file_stem_from_string(from_string):
@@ -286,3 +1293,75 @@ class MemoBook:
         settings_path = path / ".settings"
         Settings.create(settings_path, default_settings)
         return cls(path)
+
+
+class _QueryPlan:
+    """The evaluation of a parsed query, see `MemoBook._run_query_plan`.
+
+    The lookups of the terms and the costs of the parts of the query are computed once.
+    """
+
+    __slots__ = ("costs", "lookups", "memobook", "universe", "use_index")
+
+    def __init__(self, memobook: MemoBook, use_index: bool) -> None:
+        """Create a plan for the memos of a memo book.
+
+        Args:
+            memobook: The memo book.
+            use_index: If True, words are looked up in the index, otherwise every memo may have them.
+        """
+        self.memobook = memobook
+        self.use_index = use_index
+        self.universe = set(memobook._get_names())
+        self.lookups = {}
+        self.costs = {}
+
+    def look_up(self, term: Term) -> tuple:
+        """Get the memos that surely have a term and the memos that may have it (see `MemoBook._look_up_term`)."""
+        key = (term.field, term.value)
+        if key not in self.lookups:
+            self.lookups[key] = self.memobook._look_up_term(term, self.use_index, self.universe)
+        return self.lookups[key]
+
+    def get_cost(self, node) -> int:
+        """Get the cost of a part of the query (see `MemoBook._get_query_cost`)."""
+        if id(node) not in self.costs:
+            self.costs[id(node)] = MemoBook._get_query_cost(node, self.use_index)
+        return self.costs[id(node)]
+
+    def evaluate(self, node, within: set) -> tuple:
+        """Evaluate a part of the query among the given memos, the cheapest parts of a group first.
+
+        Returns:
+            A tuple of the set of the memos that surely match the part and the set of the memos that may match it.
+        """
+        if isinstance(node, Term):
+            sure, possible = self.look_up(node)
+            return sure & within, possible & within
+        if isinstance(node, Not):
+            sure, possible = self.evaluate(node.node, within)
+            return within - possible, within - sure
+        if isinstance(node, And):
+            sure, possible = within, within
+            for child in sorted(node.nodes, key=self.get_cost):
+                if not possible:
+                    break
+                child_sure, possible = self.evaluate(child, possible)
+                sure = sure & child_sure
+            return sure, possible
+        sure, possible = set(), set()
+        for child in sorted(node.nodes, key=self.get_cost):
+            child_sure, child_possible = self.evaluate(child, within - sure)
+            sure |= child_sure
+            possible |= child_possible
+        return sure, possible
+
+    def is_match(self, node, name: str, found: set) -> bool:
+        """Check if a memo that may match the query matches a part of it, given the words found in its text."""
+        if isinstance(node, Term):
+            sure, possible = self.look_up(node)
+            return name in sure or (name in possible and MemoBook._get_term_word(node) in found)
+        if isinstance(node, Not):
+            return not self.is_match(node.node, name, found)
+        matches = (self.is_match(child, name, found) for child in sorted(node.nodes, key=self.get_cost))
+        return all(matches) if isinstance(node, And) else any(matches)
@@ -0,0 +1,242 @@
+"""The search query language.
+
+A query is made of:
+
+- `word`: the memos with the word in the name or the content (case-insensitive, a part of a word is enough);
+- `"two words"`: the memos with the phrase;
+- `name:word`: the memos with the word in the name;
+- `tag:word` or `#word`: the memos with `#word`, like a word, e.g. the memos with a hashtag that starts with it;
+- `domain:example.com`: the memos with a link to the domain;
+- `date:2026-01..2026-03`, `date:2026-05`, `after:2026-09-01`, `before:2026`: the memos by date;
+- `a b`: the memos that match both `a` and `b`;
+- `a OR b`: the memos that match `a` or `b` (`OR` in uppercase, it binds looser than the implied AND);
+- `-a`: the memos that do not match `a`, `a` can be a word, a phrase, a field or a group;
+- `(a OR b) c`: grouping.
+
+A field can have a quoted value: `name:"two words"`.
+"""
+
+import re
+
+FIELD_TEXT = "text"
+FIELD_NAME = "name"
+FIELD_TAG = "tag"
+FIELD_DOMAIN = "domain"
+FIELD_DATE = "date"
+DATE_FIELDS = ("date", "after", "before")  # the value of a date term is the whole term, e.g. "after:2026-05"
+OR_OPERATOR = "OR"
+QUERY_TOKEN_REGEX = re.compile(
+    r"""\s*(?:
+    (?P<open>\()
+    | (?P<close>\))
+    | (?P<not>-)(?=\()
+    | (?P<negate>-)?(?:(?P<field>[a-zA-Z]+):)?(?:"(?P<phrase>[^"]*)"?|(?P<word>[^\s()"]+))
+    )""",
+    re.VERBOSE,
+)
+
+
+class Term:
+    """A term of a query: a word or a phrase in a field."""
+
+    __slots__ = ("field", "value")
+
+    def __init__(self, field: str, value: str) -> None:
+        """Create a term.
+
+        Args:
+            field: `FIELD_TEXT`, `FIELD_NAME`, `FIELD_TAG`, `FIELD_DOMAIN` or `FIELD_DATE`.
+            value: The lowercased value, a hashtag with "#" for a tag, the whole term for a date.
+        """
+        self.field = field
+        self.value = value
+
+    def __repr__(self):
+        """Return the representation of the term."""
+        return f"Term({self.field!r}, {self.value!r})"
+
+
+class Not:
+    """The memos that do not match a part of a query."""
+
+    __slots__ = ("node",)
+
+    def __init__(self, node) -> None:
+        """Negate a part of a query."""
+        self.node = node
+
+    def __repr__(self):
+        """Return the representation of the negation."""
+        return f"Not({self.node!r})"
+
+
+class And:
+    """The memos that match all the parts of a group."""
+
+    __slots__ = ("nodes",)
+
+    def __init__(self, nodes) -> None:
+        """Create a group of the parts of a query."""
+        self.nodes = nodes
+
+    def __repr__(self):
+        """Return the representation of the group."""
+        return f"And({self.nodes!r})"
+
+
+class Or:
+    """The memos that match any of the parts of a group."""
+
+    __slots__ = ("nodes",)
+
+    def __init__(self, nodes) -> None:
+        """Create a group of the alternatives of a query."""
+        self.nodes = nodes
+
+    def __repr__(self):
+        """Return the representation of the group."""
+        return f"Or({self.nodes!r})"
+
+
+def _make_term(field: str | None, phrase: str | None, word: str | None) -> Term:
+    """Make the term of a query token."""
+    value = (word if phrase is None else phrase).lower()
+    field = field.lower() if field else None
+    if field in DATE_FIELDS:
+        return Term(FIELD_DATE, f"{field}:{value}")
+    if field == FIELD_TAG:
+        return Term(FIELD_TAG, value if value.startswith("#") else f"#{value}")
+    if field in (FIELD_NAME, FIELD_DOMAIN):
+        return Term(field, value)
+    if field:  # not a field, e.g. "http://example.com" or "todo:"
+        value = f"{field.lower()}:{value}"
+    if phrase is None and len(value) > 1 and value.startswith("#"):
+        return Term(FIELD_TAG, value)
+    return Term(FIELD_TEXT, value)
+
+
+def _tokenize(query: str) -> list:
+    """Split a query into "(", ")", "-" (before a group), "OR" and terms."""
+    tokens = []
+    position = 0
+    while query[position:].strip():
+        match = QUERY_TOKEN_REGEX.match(query, position)
+        position = match.end()
+        if match["open"] or match["close"] or match["not"]:
+            tokens.append(match[0].strip())
+        elif match["word"] == OR_OPERATOR and not match["negate"] and not match["field"]:
+            tokens.append(OR_OPERATOR)
+        else:
+            term = _make_term(match["field"], match["phrase"], match["word"])
+            if term.value:  # not an empty phrase
+                tokens.append(Not(term) if match["negate"] else term)
+    return tokens
+
+
+class _QueryParser:
+    """A recursive descent parser of the tokens of a query, see `parse_query`."""
+
+    __slots__ = ("position", "tokens")
+
+    def __init__(self, tokens: list) -> None:
+        """Create a parser of the tokens made by `_tokenize`."""
+        self.tokens = tokens
+        self.position = 0
+
+    def is_at(self, *tokens) -> bool:
+        """Check if the current token is one of the given ones."""
+        return self.position < len(self.tokens) and self.tokens[self.position] in tokens
+
+    def parse(self):
+        """Parse all the tokens, the parts around a stray ")" are joined like the words of a group."""
+        root = None
+        while self.position < len(self.tokens):
+            node = self.parse_or()
+            self.position += 1  # a stray ")"
+            if node is not None:
+                root = node if root is None else And([root, node])
+        return root
+
+    def parse_or(self):
+        """Parse the alternatives up to the end of a group."""
+        nodes = []
+        while self.position < len(self.tokens) and not self.is_at(")"):
+            if self.is_at(OR_OPERATOR):
+                self.position += 1
+                continue
+            nodes.append(self.parse_and())
+        return self._join(Or, nodes)
+
+    def parse_and(self):
+        """Parse the parts of a group up to an "OR" or the end of the group."""
+        nodes = []
+        while self.position < len(self.tokens) and not self.is_at(")", OR_OPERATOR):
+            nodes.append(self.parse_unary())
+        return self._join(And, nodes)
+
+    def parse_unary(self):
+        """Parse a term, a group or a negated group."""
+        part = self.tokens[self.position]
+        self.position += 1
+        if part == "-":
+            if not self.is_at("("):
+                return None
+            node = self.parse_unary()
+            return None if node is None else Not(node)
+        if part == "(":
+            node = self.parse_or()
+            self.position += 1  # ")", if the group is closed
+            return node
+        return part
+
+    @staticmethod
+    def _join(group, nodes):
+        """Join the parsed nodes into a group, a single node is returned as is and no nodes as None."""
+        nodes = [node for node in nodes if node is not None]
+        return nodes[0] if len(nodes) == 1 else group(nodes) if nodes else None
+
+
+def parse_query(query: str):
+    """Parse a search query into a tree of `Term`, `Not`, `And` and `Or`.
+
+    Any text is a valid query: an unclosed quote or group ends with the query, a stray ")" or "OR" is ignored.
+
+    Args:
+        query: The query.
+
+    Returns:
+        The root of the tree or None if the query is empty.
+    """
+    return _QueryParser(_tokenize(query)).parse()
+
+
+def get_search_words(node):
+    """Get the include and exclude words of a query that is a conjunction of words, hashtags and dates.
+
+    Such a query is searched like the words typed before the query language (see `MemoBook.search`).
+
+    Args:
+        node: The root of a parsed query.
+
+    Returns:
+        A tuple of the include and exclude words or None if the query is not such a conjunction.
+    """
+    include, exclude = [], []
+    for part in node.nodes if isinstance(node, And) else [node]:
+        is_negated = isinstance(part, Not)
+        term = part.node if is_negated else part
+        if not isinstance(term, Term) or term.field not in (FIELD_TEXT, FIELD_TAG, FIELD_DATE):
+            return None
+        (exclude if is_negated else include).append(term.value)
+    return include, exclude
+
+
+def get_terms(node, is_negated: bool = False):
+    """Iterate over the terms of a query with a flag that is True for the negated ones."""
+    if isinstance(node, Term):
+        yield node, is_negated
+    elif isinstance(node, Not):
+        yield from get_terms(node.node, not is_negated)
+    else:
+        for child in node.nodes:
+            yield from get_terms(child, is_negated)
@@ -0,0 +1,74 @@
+"""Rank the results of a search by relevance."""
+
+import heapq
+import math
+
+BM25_K1 = 1.2  # how fast the score of a term saturates with its number of occurrences
+BM25_B = 0.75  # how much the length of a memo lowers the score of its terms
+NAME_BOOST = 3.0  # added if all the search words are in the name of a memo, a part of it for some of them
+TITLE_BOOST = 1.5  # the same for the title
+RECENCY_BOOST = 1.0  # added for a memo modified just now, halved every `RECENCY_HALF_LIFE_DAYS`
+RECENCY_HALF_LIFE_DAYS = 30
+NS_PER_DAY = 24 * 60 * 60 * 10**9
+
+
+def get_bm25_scores(memo_count: int, average_length: float, statistics) -> dict:
+    """Score memos with BM25 (Okapi, with the non-negative idf of Lucene).
+
+    Args:
+        memo_count: The number of memos.
+        average_length: The average length of the memos in tokens.
+        statistics: For every term, a tuple of the number of memos with the term and a dict
+            {memo name: (the number of occurrences of the term, the length of the memo)},
+            see `MemoIndex.get_term_statistics`.
+
+    Returns:
+        The scores of the memos in the dicts of the statistics by memo name.
+    """
+    scores = {}
+    for term_count, postings in statistics:
+        idf = math.log(1 + (memo_count - term_count + 0.5) / (term_count + 0.5))
+        for name, (count, length) in postings.items():
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (average_length or 1))
+            scores[name] = scores.get(name, 0.0) + idf * count * (BM25_K1 + 1) / (count + norm)
+    return scores
+
+
+def get_boost(words, name: str, title: str, mtime_ns: int, now_ns: int) -> float:
+    """Get the boost of a memo for the search words found in its name and title and for its recency.
+
+    Args:
+        words: The lowercased search words.
+        name: The name of the memo.
+        title: The title of the memo.
+        mtime_ns: The modification time of the memo in nanoseconds.
+        now_ns: The current time in nanoseconds.
+
+    Returns:
+        The boost, added to the BM25 score.
+    """
+    boost = 0.0
+    if words:
+        name, title = name.lower(), title.lower()
+        boost += NAME_BOOST * sum(word in name for word in words) / len(words)
+        boost += TITLE_BOOST * sum(word in title for word in words) / len(words)
+    age_days = max(0, now_ns - mtime_ns) / NS_PER_DAY
+    return boost + RECENCY_BOOST * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+
+def order_by_score(names, scores: dict, top_k: int) -> list:
+    """Put the names with the best scores first.
+
+    Only the `top_k` best are selected (with a heap) and sorted, the rest keep their order.
+
+    Args:
+        names: The names.
+        scores: The scores by name.
+        top_k: The number of the best names to sort, e.g. the number of rows on the first page of a list.
+
+    Returns:
+        The ordered names, the ties keep their order.
+    """
+    top = heapq.nlargest(top_k, names, key=scores.__getitem__)
+    selected = set(top)
+    return top + [name for name in names if name not in selected]
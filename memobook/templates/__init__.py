@@ -1,9 +1,12 @@
 """Templates for memo app."""
 from pathlib import Path
 
+import markdown_it_pyrs
 from markdown_it_pyrs import MarkdownIt
 
 markdowner = MarkdownIt("gfm")
+# changes whenever the same markdown may render differently, used as a part of rendered HTML cache keys
+RENDERER_VERSION = f"markdown-it-pyrs {getattr(markdown_it_pyrs, '__version__', '')} gfm 1"
 
 
 class Templates:
@@ -16,7 +19,15 @@ class Templates:
 
     def render(self, markdown: str) -> str:
         """Render the template with the given title and content."""
-        content = markdowner.render(markdown)
+        return self.fill(self.render_content(markdown))
+
+    @staticmethod
+    def render_content(markdown: str) -> str:
+        """Render the markdown to the HTML that goes into the template."""
+        return markdowner.render(markdown)
+
+    def fill(self, content: str) -> str:
+        """Fill the template with the rendered content."""
         return self.template.replace("{{content}}", content)
 
 
@@ -4,7 +4,7 @@
 import json
 import re
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import parse_qsl, urlencode, urlparse, urlsplit, urlunsplit
 
 from html2text import HTML2Text
 
@@ -18,6 +18,8 @@ VALIDATE_URL_REGEX = re.compile(
     re.IGNORECASE,
 )
 
+TRACKING_QUERY_PARAM_REGEX = re.compile(r"^(?:utm_\w+|fbclid|gclid|yclid|mc_cid|mc_eid)$", re.IGNORECASE)
+
 DEFAULT_HTML2TEXT_SETTINGS = {
     "unicode_snob": True,
     "slip_internal_links": True,
@@ -41,6 +43,58 @@ def get_domain_name_from_url(url):
     return urlparse(url).netloc
 
 
+def read_memo_text(path: Path) -> str:
+    """Read a memo file for the index and the search.
+
+    The bytes that are not UTF-8 (e.g. of a file written by another program in another encoding) are replaced
+    with U+FFFD, so such a memo is still indexed and searched by the rest of its text.
+
+    Args:
+        path: The path to the memo file.
+
+    Returns:
+        The text of the memo file.
+    """
+    return path.read_bytes().decode("utf-8", errors="replace")
+
+
+def normalize_url(url: str) -> str:
+    """Normalize the given URL, so the different URLs of the same page become equal.
+
+    The scheme and the host are lowercased, http becomes https, "www." and the default port are removed,
+    as well as the fragment, the tracking query parameters (utm_*, fbclid...) and the trailing slash.
+
+    Args:
+        url: The URL to normalize.
+
+    Returns:
+        The normalized URL or an empty string if the URL is empty.
+    """
+    url = url.strip()
+    if not url:
+        return ""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    host = parts.hostname or ""
+    if host.startswith("www."):
+        host = host[len("www.") :]
+    try:
+        port = parts.port
+    except ValueError:  # not a number
+        port = None
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not TRACKING_QUERY_PARAM_REGEX.match(key)
+        ]
+    )
+    return urlunsplit((scheme, netloc, parts.path.rstrip("/"), query, ""))
+
+
 class HTML2MarkdownParser:
     """Convert HTML to Markdown.
 
@@ -0,0 +1,261 @@
+"""Watch a memo book directory for changes made by other programs."""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+
+MEMO_CREATED = "created"
+MEMO_MODIFIED = "modified"
+MEMO_DELETED = "deleted"
+MEMO_MOVED = "moved"
+MEMO_RESCAN = "rescan"  # events were lost, every memo file has to be compared with the index
+
+logger = logging.getLogger(__name__)
+
+POLLING_INTERVAL = 2.0  # seconds
+COALESCE_DELAY = 0.2  # seconds to wait for more events of the same burst
+
+# the inotify event masks, see the inotify(7) man page
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class MemoBookWatcher:
+    """Watch the memo files of a directory in a background thread.
+
+    Uses inotify on Linux and polls the directory with `os.scandir` elsewhere
+    (or if inotify is not available). The changes are reported in batches
+    of `(action, name, new_name)` tuples, where the action is one of
+    `MEMO_CREATED`, `MEMO_MODIFIED`, `MEMO_DELETED` and `MEMO_MOVED`,
+    the name is the memo name (file stem) and `new_name` is set for moved memos only.
+    If the kernel drops events, a `(MEMO_RESCAN, None, None)` change is reported instead of them.
+    An error of the callback is logged and the watching goes on.
+    """
+
+    def __init__(self, path: Path, extension: str, on_changes) -> None:
+        """Create a watcher, call `start` to start watching.
+
+        Args:
+            path: The directory to watch.
+            extension: The extension of the memo files, e.g. ".md".
+            on_changes: Callable that gets a list of changes. It is called from the watcher thread.
+        """
+        self._path = path
+        self._extension = extension
+        self._on_changes = on_changes
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Start watching in a background thread."""
+        self._thread = threading.Thread(target=self._run, name=f"watcher {self._path.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and wait for the watcher thread to finish."""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _get_memo_name(self, file_name: str):
+        """Get the memo name from a file name or None if it is not a memo file."""
+        if file_name.startswith(".") or not file_name.endswith(self._extension):
+            return None
+        return file_name[: -len(self._extension)]
+
+    def _report(self, changes) -> None:
+        """Report changes to the callback, the watcher thread survives its errors."""
+        try:
+            self._on_changes(changes)
+        except Exception:
+            logger.exception("Failed to apply the changes of the memo files in %s", self._path)
+
+    def _run(self) -> None:
+        fd = self._init_inotify()
+        if fd is None:
+            self._poll()
+            return
+        try:
+            self._read_inotify(fd)
+        finally:
+            os.close(fd)
+
+    ########################################
+    # inotify
+    ########################################
+
+    def _init_inotify(self):
+        """Start an inotify watch of the directory.
+
+        Returns:
+            The inotify file descriptor or None if inotify is not available.
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(self._path), INOTIFY_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def _read_inotify(self, fd: int) -> None:
+        """Read inotify events until stopped, report them in coalesced batches."""
+        pending = b""
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([fd], [], [], POLLING_INTERVAL)
+            if not ready:
+                continue
+            # let the burst of events (e.g. a sync client writing many files) settle
+            self._stop_event.wait(COALESCE_DELAY)
+            try:
+                pending += os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            changes, pending, is_gone = self._parse_inotify_events(pending)
+            if changes:
+                self._report(changes)
+            if is_gone:  # the directory itself was deleted or moved
+                return
+
+    def _parse_inotify_events(self, data: bytes):
+        """Parse raw inotify events.
+
+        Returns:
+            A tuple of the list of changes, the unparsed rest of the data
+            and a flag that is True if the watched directory is gone.
+        """
+        changes = []
+        moved_from = {}  # cookie -> name
+        is_gone = False
+        events, rest = self._split_inotify_events(data)
+        for mask, cookie, raw_name in events:
+            if mask & IN_Q_OVERFLOW:  # the kernel dropped events
+                changes.append((MEMO_RESCAN, None, None))
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                is_gone = True
+                continue
+            name = self._get_memo_name(os.fsdecode(raw_name))
+            if mask & IN_MOVED_FROM:
+                if name is not None:
+                    moved_from[cookie] = name
+            elif mask & IN_MOVED_TO:
+                change = self._get_move_change(moved_from.pop(cookie, None), name)
+                if change is not None:
+                    changes.append(change)
+            elif name is None:
+                continue
+            elif mask & IN_CLOSE_WRITE:
+                changes.append((MEMO_MODIFIED, name, None))
+            elif mask & IN_DELETE:
+                changes.append((MEMO_DELETED, name, None))
+        # moved out of the directory
+        changes.extend((MEMO_DELETED, name, None) for name in moved_from.values())
+        return changes, rest, is_gone
+
+    @staticmethod
+    def _split_inotify_events(data: bytes):
+        """Split raw inotify data into events.
+
+        Returns:
+            A tuple of the list of `(mask, cookie, raw name)` of the complete events and the rest of the data.
+        """
+        events = []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            _wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+            end = offset + INOTIFY_EVENT.size + length
+            if end > len(data):
+                break
+            events.append((mask, cookie, data[offset + INOTIFY_EVENT.size : end].rstrip(b"\0")))
+            offset = end
+        return events, data[offset:]
+
+    @staticmethod
+    def _get_move_change(old_name, name):
+        """Get the change of a file renamed in the directory.
+
+        Args:
+            old_name: The memo name before, None if it was not a memo file or was moved from another directory.
+            name: The memo name after, None if it is not a memo file.
+
+        Returns:
+            A change or None if neither name is a memo.
+        """
+        if old_name is None:
+            return None if name is None else (MEMO_CREATED, name, None)
+        if name is None:  # renamed to a non-memo file
+            return MEMO_DELETED, old_name, None
+        return MEMO_MOVED, old_name, name
+
+    ########################################
+    # Polling
+    ########################################
+
+    def _scan(self) -> dict:
+        """Get the (mtime_ns, size) of every memo file in the directory."""
+        snapshot = {}
+        try:
+            with os.scandir(self._path) as entries:
+                for entry in entries:
+                    name = self._get_memo_name(entry.name)
+                    if name is None or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    snapshot[name] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        return snapshot
+
+    def _poll(self) -> None:
+        """Compare snapshots of the directory until stopped."""
+        snapshot = self._scan()
+        while not self._stop_event.wait(POLLING_INTERVAL):
+            new_snapshot = self._scan()
+            changes = self._diff_snapshots(snapshot, new_snapshot)
+            snapshot = new_snapshot
+            if changes:
+                self._report(changes)
+
+    @staticmethod
+    def _diff_snapshots(old: dict, new: dict) -> list:
+        """Get the changes between two snapshots.
+
+        A deleted and a created file with the same mtime and size are reported as a move.
+        """
+        deleted = {name: stat for name, stat in old.items() if name not in new}
+        created = [name for name in new if name not in old]
+        changes = [(MEMO_MODIFIED, name, None) for name, stat in new.items() if name in old and old[name] != stat]
+        deleted_by_stat = {stat: name for name, stat in deleted.items()}
+        for name in created:
+            old_name = deleted_by_stat.pop(new[name], None)
+            if old_name is not None:
+                del deleted[old_name]
+                changes.append((MEMO_MOVED, old_name, name))
+            else:
+                changes.append((MEMO_CREATED, name, None))
+        changes.extend((MEMO_DELETED, name, None) for name in deleted)
+        return changes
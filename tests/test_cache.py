@@ -0,0 +1,60 @@
+"""Tests of the caches."""
+
+import os
+
+from cache import DiskCache, LRUCache
+
+
+def test_lru_cache_max_items():
+    """The least recently used item is evicted, getting an item makes it the most recently used."""
+    cache = LRUCache(max_items=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.items() == [("a", 1), ("c", 3)]
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert cache.get("b", "missing") == "missing"
+    assert cache.misses == 1
+
+
+def test_lru_cache_max_size():
+    """Items are evicted until the total size fits, an item larger than the limit is not cached."""
+    cache = LRUCache(max_size=10, get_size=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    cache.put("a", "xxx")  # replacing an item replaces its size
+    assert cache.size == 7
+    cache.put("c", "xxxxx")
+    assert cache.items() == [("a", "xxx"), ("c", "xxxxx")]
+    assert cache.size == 8
+    cache.put("d", "x" * 11)
+    assert "d" not in cache
+    assert len(cache) == 2
+    cache.clear()
+    assert (len(cache), cache.size) == (0, 0)
+
+
+def test_disk_cache(tmp_path):
+    """Items are kept in files that survive the cache object."""
+    path = tmp_path / "cache"
+    cache = DiskCache(path, max_size=100, suffix=".html")
+    assert cache.get("a") is None
+    cache.put("a", "привіт")
+    cache.put("a", "hello")
+    assert DiskCache(path, max_size=100, suffix=".html").get("a") == "hello"
+    assert [file.name for file in path.iterdir()] == ["a.html"]
+
+
+def test_disk_cache_eviction(tmp_path):
+    """The least recently used files are deleted until the cache is 10% below its size limit."""
+    cache = DiskCache(tmp_path, max_size=100)
+    for age, key in enumerate(["c", "b", "a"]):
+        cache.put(key, key * 30)
+        os.utime(tmp_path / key, ns=(10**18 - age * 10**9,) * 2)  # "a" is the least recently used
+    cache.put("d", "d" * 30)
+    assert cache.get("a") is None
+    assert [cache.get(key) for key in "bcd"] == ["b" * 30, "c" * 30, "d" * 30]
+    cache.put("e", "e" * 101)
+    assert cache.get("e") is None
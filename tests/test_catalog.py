@@ -0,0 +1,63 @@
+"""Tests of the columnar memo catalog."""
+
+import pytest
+
+from catalog import CatalogView, MemoCatalog
+
+ROWS = [
+    ("a", 3, 30, "Zebra", ("#x",), "example.com"),
+    ("b", 1, 10, "b", (), ""),
+    ("c", 2, 20, "apple", ("#x", "#y"), "python.org"),
+]
+
+
+@pytest.fixture
+def catalog():
+    """Build a catalog of three memos."""
+    return MemoCatalog(ROWS)
+
+
+def test_get_record(catalog):
+    """A record is made of the columns of a row, the shared hashtags are stored once."""
+    record = catalog.get_record(2)
+    assert (record.name, record.mtime_ns, record.size, record.title, record.hashtags, record.domain) == ROWS[2]
+    assert catalog.tags == ["#x", "#y"]
+    assert catalog.find_row("c") == 2
+    assert catalog.find_row("d") is None
+
+
+def test_index_of(catalog):
+    """The index of a memo follows the order of the view, memos out of the view have none."""
+    view = CatalogView(catalog, catalog.get_rows(["c", "a"]))
+    assert [record.name for record in view] == ["c", "a"]
+    assert view.index_of("a") == 1
+    assert view.index_of("c") == 0
+    assert view.index_of("b") is None
+    assert view.index_of("d") is None
+    view.sort_by("name")
+    assert view.index_of("a") == 0
+
+
+@pytest.mark.parametrize(
+    ("attribute", "reverse", "expected"),
+    [
+        ("name", True, ["c", "b", "a"]),
+        ("title", False, ["c", "b", "a"]),
+        ("domain", False, ["b", "a", "c"]),
+        ("hashtags", False, ["b", "a", "c"]),
+        ("size", False, ["b", "c", "a"]),
+        ("mtime_ns", True, ["a", "c", "b"]),
+    ],
+)
+def test_sort_by(catalog, attribute, reverse, expected):
+    """A view is sorted by a column, the indexes of the memos follow the new order."""
+    view = CatalogView(catalog)
+    view.sort_by(attribute, reverse=reverse)
+    assert [record.name for record in view] == expected
+    assert [view.index_of(name) for name in expected] == [0, 1, 2]
+
+
+def test_sort_by_unknown_attribute(catalog):
+    """Only the attributes of a record are sort keys."""
+    with pytest.raises(ValueError, match="Unknown memo attribute"):
+        CatalogView(catalog).sort_by("modified")
@@ -0,0 +1,93 @@
+"""Tests of the memo book index."""
+
+import pytest
+
+from index import MemoIndex
+
+
+def upsert(index: MemoIndex, name: str, content: str, mtime_ns: int = 1) -> None:
+    """Add a memo with the given content to the index."""
+    index.upsert(
+        name,
+        mtime_ns=mtime_ns,
+        size=len(content),
+        title=name.title(),
+        hashtags=["#b", "#a"],
+        domain="example.com",
+        link="https://example.com/",
+        content=content,
+    )
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Open a new index."""
+    index = MemoIndex(tmp_path / "index.db")
+    yield index
+    index.close()
+
+
+def test_upsert(index):
+    """A memo is added once and updated in place."""
+    assert index.is_new
+    upsert(index, "b", "old content")
+    upsert(index, "a", "content")
+    upsert(index, "b", "new content", mtime_ns=2)
+    assert index.get_names() == ["a", "b"]
+    assert index.get_memos()[1] == ("b", 2, len("new content"), "B", ("#a", "#b"), "example.com")
+    assert index.get_manifest()["b"][:2] == (2, len("new content"))
+
+
+def test_rename(index):
+    """A renamed memo keeps its metadata."""
+    upsert(index, "a", "content")
+    index.rename("a", "c")
+    assert index.get_names() == ["c"]
+    assert index.get_manifest_entry("a") is None
+    assert index.get_memos()[0][1:] == (1, len("content"), "A", ("#a", "#b"), "example.com")
+
+
+def test_delete(index):
+    """A deleted memo is gone from the index, deleting an unknown memo does nothing."""
+    upsert(index, "a", "content")
+    upsert(index, "b", "content")
+    index.delete("a")
+    index.delete("x")
+    assert index.get_names() == ["b"]
+    assert list(index.get_manifest()) == ["b"]
+
+
+def test_reopen(tmp_path):
+    """A built index is not new when it is opened again, an index that was not marked as built is."""
+    index = MemoIndex(tmp_path / "index.db")
+    upsert(index, "a", "content")
+    index.close()
+    index = MemoIndex(tmp_path / "index.db")
+    assert index.is_new
+    assert index.get_names() == []
+    upsert(index, "a", "content")
+    index.mark_built()
+    index.close()
+    index = MemoIndex(tmp_path / "index.db")
+    assert not index.is_new
+    assert index.get_names() == ["a"]
+    index.close()
+
+
+def test_search_full_text(tmp_path):
+    """The FTS5 table finds words by prefix, a rename and a delete keep it in sync."""
+    index = MemoIndex(tmp_path / "index.db", full_text_search=True)
+    if not index.has_full_text_search:
+        index.close()
+        pytest.skip("SQLite has no FTS5")
+    upsert(index, "a", "apple banana")
+    upsert(index, "b", "banana cherry")
+    upsert(index, "c", "cherry")
+    assert sorted(index.search_full_text(["ban"])) == ["a", "b"]
+    assert index.search_full_text(["ban"], ["cher"]) == ["a"]
+    assert index.search_full_text(exclude=["ban"]) == ["c"]
+    index.rename("a", "d")
+    assert index.search_full_text(["apple"]) == ["d"]
+    index.delete("b")
+    assert index.search_full_text(["banana"]) == ["d"]
+    index.close()
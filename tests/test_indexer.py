@@ -0,0 +1,65 @@
+"""Tests of the index build."""
+
+import os
+
+import pytest
+
+import indexer
+from index import MemoIndex
+from indexer import analyze_memo_files, build_index
+
+
+@pytest.fixture
+def memos(tmp_path):
+    """Write memo files, return the path of the memo book and the memo names."""
+    names = [f"memo {i}" for i in range(12)]
+    for i, name in enumerate(names):
+        (tmp_path / f"{name}.md").write_text(f"https://example.com/{i}\n\n# Title {i}\n\nword{i}", encoding="utf-8")
+    return tmp_path, names
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Open a new index."""
+    index = MemoIndex(tmp_path / "index.db")
+    yield index
+    index.close()
+
+
+def test_analyze_memo_files(memos):
+    """A deleted memo is skipped, the others are parsed."""
+    path, names = memos
+    records = analyze_memo_files(path, [names[0], "deleted"], ".md")
+    assert [record["name"] for record in records] == [names[0]]
+    assert records[0]["title"] == "Title 0"
+    assert records[0]["link"] == "https://example.com/0"
+    assert records[0]["size"] == (path / f"{names[0]}.md").stat().st_size
+
+
+@pytest.mark.parametrize("is_parallel", [False, True])
+def test_build_index(memos, index, monkeypatch, is_parallel):
+    """Every memo is indexed in chunks, serially or by a process pool, and the progress is reported."""
+    path, names = memos
+    monkeypatch.setattr(indexer, "INDEX_CHUNK_SIZE", 5)
+    if is_parallel:
+        monkeypatch.setattr(indexer, "PARALLEL_BUILD_MIN_MEMOS", 0)
+        monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    progress = []
+    assert build_index(index, path, names, ".md", on_progress=lambda *args: progress.append(args), max_workers=2)
+    assert index.get_names() == sorted(names)
+    assert index.find("word11") == ({"memo 11"}, False)
+    assert len(progress) == 3  # one report per chunk, the chunks of the workers come in any order
+    assert progress[-1] == (12, 12)
+
+
+def test_build_index_cancelled(memos, index, monkeypatch):
+    """A cancelled build stops between the chunks."""
+    path, names = memos
+    monkeypatch.setattr(indexer, "INDEX_CHUNK_SIZE", 5)
+    progress = []
+    is_built = build_index(
+        index, path, names, ".md", on_progress=lambda *args: progress.append(args), is_cancelled=lambda: bool(progress)
+    )
+    assert not is_built
+    assert progress == [(5, 12)]
+    assert len(index.get_names()) == 5
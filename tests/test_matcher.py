@@ -0,0 +1,77 @@
+"""Tests of the search matchers."""
+
+import itertools
+import mmap
+
+import pytest
+
+from matcher import BytesSearchMatcher, SearchMatcher
+
+NAME = "Memo "
+CONTENTS = [
+    "",
+    "plain ascii text",
+    "\N{LATIN CAPITAL LETTER I WITH DOT ABOVE}stanbul",  # lowercased to "i" and a combining dot
+    "\N{KELVIN SIGN}elvin",  # the Kelvin sign, lowercased to "k"
+    "Kelvin",
+    "Straße",
+    "STRASSE",
+    "ПРИВІТ світ",
+    "caf\N{LATIN SMALL LETTER E WITH ACUTE} \N{LATIN CAPITAL LETTER E WITH ACUTE}",
+]
+WORDS = [
+    "i",
+    "i\N{COMBINING DOT ABOVE}",
+    "istanbul",
+    "i\N{COMBINING DOT ABOVE}stanbul",
+    "k",
+    "kelvin",
+    "ß",
+    "ss",
+    "straße",
+    "strasse",
+    "привіт",
+    "é",
+    "mo k",
+]
+
+
+def get_memory_map(tmp_path, data: bytes):
+    """Write the data to a file and map it into memory."""
+    path = tmp_path / "memo.md"
+    path.write_bytes(data)
+    with path.open("rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+@pytest.mark.parametrize("content", CONTENTS)
+def test_bytes_search_matcher(tmp_path, content):
+    """The raw UTF-8 content matches the same words as the lowercased text, in bytes and in a memory map."""
+    text = (NAME + content).lower()
+    data = content.encode()
+    memory_map = get_memory_map(tmp_path, data) if data else None
+    try:
+        for include, exclude in itertools.product(itertools.combinations(WORDS, 2), [(), *((word,) for word in WORDS)]):
+            matcher = SearchMatcher(include, exclude)
+            bytes_matcher = BytesSearchMatcher(matcher)
+            for raw in (data, memory_map) if memory_map else (data,):
+                assert bytes_matcher.find(NAME, raw) == matcher.find(text), (include, exclude)
+                assert bytes_matcher.matches(NAME, raw) == matcher.matches(text), (include, exclude)
+    finally:
+        if memory_map:
+            memory_map.close()
+
+
+def test_search_matcher():
+    """The words contained in a found word are found without being searched for."""
+    matcher = SearchMatcher(["abc", "b", "x"], ["bcd", "abcd"])
+    assert matcher.find("xabcd") == {"abc", "abcd", "b", "bcd", "x"}
+    assert not matcher.matches("xabcd")
+    assert matcher.matches("xabc bc")
+
+
+def test_bytes_search_matcher_invalid_utf8():
+    """The bytes that are not UTF-8 do not stop the search."""
+    matcher = BytesSearchMatcher(SearchMatcher(["café", "caf"], ["\N{KELVIN SIGN}"]))
+    assert matcher.find(NAME, "café".encode("latin-1")) == {"caf"}
+    assert matcher.find(NAME, "CAFÉ".encode() + b"\xff") == {"café", "caf"}
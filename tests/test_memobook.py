@@ -0,0 +1,211 @@
+"""Tests of the memo book."""
+
+import os
+
+import pytest
+
+from memo import SEPARATOR_LINE
+from memobook import DATE_MAX, DEFAULT_MEMOBOOK_SETTINGS, MemoBook
+from watcher import MEMO_MODIFIED, MEMO_MOVED, MEMO_RESCAN
+
+
+@pytest.fixture
+def make_memobook(tmp_path):
+    """Get a function that creates a memo book of the given memos, built with the given search backend."""
+    memobooks = []
+
+    def make_memobook(contents: dict, backend: str = "index", build: bool = True) -> MemoBook:
+        memobook = MemoBook.create(tmp_path / f"book{len(memobooks)}", DEFAULT_MEMOBOOK_SETTINGS)
+        memobooks.append(memobook)
+        memobook.settings["search_backend"] = backend
+        for name, content in contents.items():
+            (memobook.path / f"{name}.md").write_text(content, encoding="utf-8")
+        if build:
+            memobook.build_index()
+        return memobook
+
+    yield make_memobook
+    for memobook in memobooks:
+        memobook.close()
+
+
+def search(memobook: MemoBook, include, exclude=()) -> list:
+    """Search the contents of the memos, return the sorted names of the found memos."""
+    return sorted(record.name for record in memobook.search(include, list(exclude), quick_search=False))
+
+
+@pytest.mark.parametrize("backend", ["scan", "index", "fts5"])
+def test_search_backends(make_memobook, backend):
+    """Every backend finds the same memos, including the words that have no word characters."""
+    memobook = make_memobook({"a": "c++ #todo apple", "b": "python #work", "c": "apple pie"}, backend)
+    if backend == "fts5" and not memobook.index.has_full_text_search:
+        pytest.skip("SQLite has no FTS5")
+    assert search(memobook, ["apple"]) == ["a", "c"]
+    assert search(memobook, ["app"], ["pie"]) == ["a"]
+    assert search(memobook, ["++"]) == ["a"]
+    assert search(memobook, ["apple"], ["++"]) == ["c"]
+    assert search(memobook, ["#todo"]) == ["a"]
+    assert search(memobook, [], ["#work"]) == ["a", "c"]
+
+
+@pytest.mark.parametrize("backend", ["scan", "index", "fts5"])
+def test_search_narrowing(make_memobook, backend):
+    """Search-as-you-type narrows the cached results to what a fresh search finds."""
+    contents = {f"m{i}": " ".join(["apple", "apricot", "banana", "#fruit"][: i % 5]) for i in range(20)}
+    memobook = make_memobook(contents, backend)
+    fresh = make_memobook(contents, backend)
+    for include, exclude in [(["a"], []), (["ap"], []), (["apr"], []), (["apr", "ban"], []), (["apr"], ["#f"])]:
+        assert search(memobook, include, exclude) == search(fresh, include, exclude)
+        fresh._invalidate_search_cache()
+
+
+def test_search_narrowing_after_change(make_memobook):
+    """A change of the memo book drops the cached results, they are not narrowed any more."""
+    memobook = make_memobook({"a": "apple", "b": "banana"})
+    assert search(memobook, ["a"]) == ["a", "b"]
+    memobook.delete_memo("a")
+    memobook.add_memo("apricot", "c")
+    assert search(memobook, ["ap"]) == ["c"]
+
+
+def test_search_name_prefix(make_memobook):
+    """Memos are found by the start of their names, case-insensitively, before and after the index is built."""
+    contents = dict.fromkeys(["Apple", "apricot", "banana", "Ap", "a"], "")
+    memobook = make_memobook(contents, build=False)
+    assert [record.name for record in memobook.search_name_prefix("AP")] == ["Ap", "Apple", "apricot"]
+    memobook.build_index()
+    assert [record.name for record in memobook.search_name_prefix("a")] == ["a", "Ap", "Apple", "apricot"]
+    assert [record.name for record in memobook.search_name_prefix("apples")] == []
+    assert len(memobook.search_name_prefix("")) == len(contents)
+
+
+def test_apply_external_changes(make_memobook):
+    """The changes reported by the watcher are applied to the index, a rescan catches up with lost events."""
+    memobook = make_memobook({"a": "apple", "b": "banana"})
+    (memobook.path / "a.md").write_text("apricot", encoding="utf-8")
+    (memobook.path / "b.md").rename(memobook.path / "c.md")
+    assert memobook.apply_external_changes([(MEMO_MODIFIED, "a", None), (MEMO_MOVED, "b", "c")])
+    assert search(memobook, ["apricot"]) == ["a"]
+    assert [record.name for record in memobook.get_memos()] == ["a", "c"]
+    (memobook.path / "d.md").write_text("dates", encoding="utf-8")
+    (memobook.path / "c.md").unlink()
+    assert memobook.apply_external_changes([(MEMO_RESCAN, None, None)])
+    assert [record.name for record in memobook.get_memos()] == ["a", "d"]
+    assert not memobook.apply_external_changes([(MEMO_RESCAN, None, None)])
+
+
+def test_reconcile_on_reopen(make_memobook):
+    """The changes made while the memo book was closed are found by the stat of the memo files."""
+    memobook = make_memobook({"a": "apple", "b": "banana", "c": "cherry"})
+    memobook.close()
+    path = memobook.path
+    (path / "a.md").write_text("apricot", encoding="utf-8")
+    os.utime(path / "a.md", ns=(1, 1))  # the stat differs even on a coarse clock
+    os.utime(path / "b.md", ns=(2, 2))  # touched, not changed
+    (path / "c.md").unlink()
+    (path / "d.md").write_text("dates", encoding="utf-8")
+    memobook = MemoBook(path)
+    try:
+        assert not memobook.index.is_new
+        assert [record.name for record in memobook.get_memos()] == ["a", "b", "d"]
+        assert memobook.index.get_manifest_entry("b")[:2] == (2, len("banana"))
+        assert search(memobook, ["apricot"]) == ["a"]
+        assert search(memobook, ["dates"]) == ["d"]
+        assert search(memobook, ["cherry"]) == []
+    finally:
+        memobook.close()
+
+
+@pytest.mark.parametrize(
+    ("word", "expected"),
+    [
+        ("date:2026", ("2026", "2026" + DATE_MAX)),
+        ("date:2026-05", ("2026-05", "2026-05" + DATE_MAX)),
+        ("date:2026-01..2026-03", ("2026-01", "2026-03" + DATE_MAX)),
+        ("date:..2026-03", ("", "2026-03" + DATE_MAX)),
+        ("date:2026-01..", ("2026-01", DATE_MAX)),
+        ("after:2026-09-01", ("2026-09-01" + DATE_MAX, DATE_MAX)),
+        ("before:2026", ("", "2026")),
+        ("date:", None),
+        ("date:..", None),
+        ("date:2026-05x", None),
+        ("after:", None),
+        ("after:2026..2027", None),
+        ("before:..2026", None),
+        ("update:2026", None),
+        ("2026", None),
+    ],
+)
+def test_parse_date_term(word, expected):
+    """A date term is a range of dates, `start <= date < end`."""
+    assert MemoBook._parse_date_term(word) == expected
+
+
+@pytest.mark.parametrize(
+    ("word", "date", "is_in_range"),
+    [
+        ("date:2026-05", "2026-05-31", True),
+        ("date:2026-05", "2026-06-01", False),
+        ("date:2026-01..2026-03", "2026-03-31", True),
+        ("date:2026-01..2026-03", "2025-12-31", False),
+        ("after:2026-09-01", "2026-09-01", False),
+        ("after:2026-09-01", "2026-09-02", True),
+        ("before:2026", "2025-12-31", True),
+        ("before:2026", "2026-01-01", False),
+    ],
+)
+def test_parse_date_term_bounds(word, date, is_in_range):
+    """The bounds of `date:` are inclusive, the bound of `after:` and `before:` is not."""
+    start, end = MemoBook._parse_date_term(word)
+    assert (start <= date < end) == is_in_range
+
+
+def test_search_dates(make_memobook):
+    """Memos are found by their date hashtags, together with the words and in any order of the terms."""
+    contents = {
+        "a": "apple" + SEPARATOR_LINE + "#2025-12-31",
+        "b": "apple" + SEPARATOR_LINE + "#2026-01-15 #work",
+        "c": "cherry" + SEPARATOR_LINE + "#2026-03-01",
+        "d": "apple" + SEPARATOR_LINE + "#2026-05-20 #2026-02-01",  # the earliest date hashtag counts
+    }
+    memobook = make_memobook(contents)
+    assert search(memobook, ["date:2026"]) == ["b", "c", "d"]
+    assert search(memobook, ["date:2026-01..2026-02"]) == ["b", "d"]
+    assert search(memobook, ["apple", "after:2026-01-15"]) == ["d"]
+    assert search(memobook, ["before:2026-03"], ["apple"]) == []
+    assert search(memobook, ["apple"], ["before:2026"]) == ["b", "d"]
+
+
+@pytest.mark.parametrize("build", [False, True])
+def test_find_memos_by_link(make_memobook, build):
+    """Memos are found by their normalized links and domains, before and after the index is built."""
+    contents = {
+        "a": "https://www.example.com/page/?utm_source=x\n\n# A",
+        "b": "[B](http://example.com/page)\n\n# B",
+        "c": "https://example.com/other\n\n# C",
+        "d": "no link",
+    }
+    memobook = make_memobook(contents, build=build)
+    assert memobook.is_index_built == build
+    assert memobook.find_memos_by_link("https://example.com/page#top") == ["a", "b"]
+    assert memobook.find_memos_by_link("https://example.com/missing") == []
+    assert memobook.find_memos_by_link("") == []
+    assert memobook.find_memos_by_domain("example.com") == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("build", [False, True])
+def test_rank_names(make_memobook, build):
+    """The found memos are ordered by score, the words in the name and the frequent words first."""
+    contents = {"a": "apple", "b": "apple apple apple pie", "apple": "pie", "c": "cherry"}
+    memobook = make_memobook(contents, build=build)
+    names = ["a", "apple", "b"]
+    records, scores = memobook._rank_names(names, ["apple"], None, top_k=10)
+    assert set(scores) == set(names)
+    assert records[0].name == "apple"
+    if build:
+        assert [record.name for record in records] == ["apple", "b", "a"]
+        assert scores["b"] > scores["a"] > 0
+    records, scores = memobook._rank_names(names, [], None, top_k=10)
+    assert ([record.name for record in records], scores) == (names, {})
+    records, scores = memobook.search_query("apple -pie")
+    assert [record.name for record in records] == ["a"]
@@ -0,0 +1,54 @@
+"""Tests of the search query language."""
+
+import pytest
+
+from query import get_search_words, parse_query
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("", "None"),
+        ("   ", "None"),
+        ('""', "None"),
+        ("Word", "Term('text', 'word')"),
+        ("a b", "And([Term('text', 'a'), Term('text', 'b')])"),
+        ("a OR b c", "Or([Term('text', 'a'), And([Term('text', 'b'), Term('text', 'c')])])"),
+        ("a or b", "And([Term('text', 'a'), Term('text', 'or'), Term('text', 'b')])"),
+        ("OR a OR", "Term('text', 'a')"),
+        ("-a", "Not(Term('text', 'a'))"),
+        ("-(a OR b) c", "And([Not(Or([Term('text', 'a'), Term('text', 'b')])), Term('text', 'c')])"),
+        ('"two words', "Term('text', 'two words')"),
+        ("(a OR b", "Or([Term('text', 'a'), Term('text', 'b')])"),
+        ("a ) b", "And([Term('text', 'a'), Term('text', 'b')])"),
+        ("()", "None"),
+        ("-(", "None"),
+        ("#Todo", "Term('tag', '#todo')"),
+        ("tag:todo", "Term('tag', '#todo')"),
+        ("#", "Term('text', '#')"),
+        ('"#todo"', "Term('text', '#todo')"),
+        ('name:"Two Words"', "Term('name', 'two words')"),
+        ("domain:Example.com", "Term('domain', 'example.com')"),
+        ("after:2026-05", "Term('date', 'after:2026-05')"),
+        ("http://example.com", "Term('text', 'http://example.com')"),
+        ("todo:", "Term('text', 'todo:')"),
+    ],
+)
+def test_parse_query(query, expected):
+    """Any text is a valid query."""
+    assert repr(parse_query(query)) == expected
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("a -b #t date:2026", (["a", "#t", "date:2026"], ["b"])),
+        ("a", (["a"], [])),
+        ("a OR b", None),
+        ("a name:b", None),
+        ("a -(b c)", None),
+    ],
+)
+def test_get_search_words(query, expected):
+    """Only a conjunction of words, hashtags and dates is searched as plain words."""
+    assert get_search_words(parse_query(query)) == expected
@@ -0,0 +1,29 @@
+"""Tests of the ranking of search results."""
+
+import pytest
+
+from ranking import NAME_BOOST, NS_PER_DAY, RECENCY_BOOST, get_bm25_scores, get_boost, order_by_score
+
+
+@pytest.mark.parametrize("top_k", [0, 1, 2, 5, 10])
+def test_order_by_score(top_k):
+    """The `top_k` best names come first, best first, the rest keep their order."""
+    names = ["a", "b", "c", "d", "e"]
+    scores = {"a": 1.0, "b": 5.0, "c": 3.0, "d": 5.0, "e": 0.0}
+    ordered = order_by_score(names, scores, top_k)
+    best = ["b", "d", "c", "a", "e"][:top_k]
+    assert ordered == best + [name for name in names if name not in best]
+
+
+def test_get_bm25_scores():
+    """A rare term weighs more than a common one, and a term in a short memo more than in a long one."""
+    statistics = [(1, {"rare": (1, 10)}), (3, {"common": (1, 10), "long": (1, 100)})]
+    scores = get_bm25_scores(4, 40.0, statistics)
+    assert scores["rare"] > scores["common"] > scores["long"] > 0
+
+
+def test_get_boost():
+    """The words in the name are boosted, the boost of recency halves with age."""
+    now_ns = 100 * NS_PER_DAY
+    assert get_boost(["memo"], "My Memo", "", now_ns, now_ns) == pytest.approx(NAME_BOOST + RECENCY_BOOST)
+    assert get_boost([], "a", "", now_ns - 30 * NS_PER_DAY, now_ns) == pytest.approx(RECENCY_BOOST / 2)
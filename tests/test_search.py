@@ -0,0 +1,107 @@
+"""Tests of the memo book search."""
+
+import random
+
+import pytest
+
+from memo import SEPARATOR_LINE, Memo
+from memobook import DEFAULT_MEMOBOOK_SETTINGS, MemoBook
+from query import And, Not, Or, Term, parse_query
+
+WORDS = ["ab", "c++", "abc", "bc", "Straße", "STRASSE", "привіт", "x y", "cat", "dog", "#todo"]
+HASHTAGS = ["#work", "#home", "#work-later"]
+ATOMS = [
+    "ab",
+    "abc",
+    "ba",
+    '"x y"',
+    "strasse",
+    "straße",
+    "ПРИВІТ",
+    "cat",
+    "name:cat",
+    "name:dog",
+    "#work",
+    "tag:home",
+    "#todo",
+    "domain:example.com",
+    "zzz",
+    "++",
+]
+
+
+@pytest.fixture(scope="module")
+def memos(tmp_path_factory):
+    """Write a memo book of random memos, return its path and the contents by memo name."""
+    rng = random.Random(25)
+    path = tmp_path_factory.mktemp("search") / "book"
+    MemoBook.create(path, DEFAULT_MEMOBOOK_SETTINGS).close()
+    contents = {}
+    for i in range(120):
+        name = f"m{i} " + rng.choice(["", "cat", "a-b", "ab dog"])
+        content = " ".join(rng.sample(WORDS, rng.randint(0, 4)))
+        if rng.random() < 0.3:
+            content += "\n\n[link](https://www.example.com/x)"
+        if rng.random() < 0.4:
+            content += SEPARATOR_LINE + " ".join(rng.sample(HASHTAGS, rng.randint(1, 2)))
+        (path / f"{name}.md").write_text(content, encoding="utf-8")
+        contents[name] = content
+    return path, contents
+
+
+@pytest.fixture(params=["scan", "index"])
+def memobook(request, memos):
+    """Open the memo book with the scan or the index search backend, FTS5 finds words by prefix only."""
+    path, _contents = memos
+    memobook = MemoBook(path)
+    memobook.settings["search_backend"] = request.param
+    if request.param == "index":
+        memobook.build_index()
+    yield memobook
+    memobook.close()
+
+
+def is_match(node, name: str, content: str) -> bool:
+    """Evaluate a parsed query against a memo the naive way."""
+    text = (name + content).lower()
+    if isinstance(node, Term):
+        if node.field in ("text", "tag"):
+            return node.value in text
+        if node.field == "name":
+            return node.value in name.lower()
+        return Memo.parse_domain(content) == node.value
+    if isinstance(node, Not):
+        return not is_match(node.node, name, content)
+    if isinstance(node, And):
+        return all(is_match(child, name, content) for child in node.nodes)
+    assert isinstance(node, Or)
+    return any(is_match(child, name, content) for child in node.nodes)
+
+
+def make_query(rng, depth: int = 0) -> str:
+    """Make a random query of the atoms."""
+    if depth > 2 or rng.random() < 0.4:
+        return ("-" if rng.random() < 0.25 else "") + rng.choice(ATOMS)
+    parts = [make_query(rng, depth + 1) for _ in range(rng.randint(1, 3))]
+    group = (" OR " if rng.random() < 0.5 else " ").join(parts)
+    return ("-" if rng.random() < 0.2 else "") + f"({group})"
+
+
+def test_search_query(memobook, memos):
+    """The query plan finds what a naive evaluation of the query does."""
+    _path, contents = memos
+    rng = random.Random(5)
+    for _ in range(300):
+        query = make_query(rng)
+        records, _scores = memobook.search_query(query)
+        node = parse_query(query)
+        expected = sorted(name for name, content in contents.items() if is_match(node, name, content))
+        assert sorted(record.name for record in records) == expected, query
+
+
+def test_search_inline_hashtag(memobook, memos):
+    """A hashtag is found in the text too, not only in the hashtags of the footer."""
+    _path, contents = memos
+    names = [record.name for record in memobook.search(["#todo"], quick_search=False)]
+    assert names == sorted(name for name, content in contents.items() if "#todo" in content)
+    assert names
@@ -0,0 +1,27 @@
+"""Tests of the utilities."""
+
+import pytest
+
+from utils import normalize_url
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("", ""),
+        ("   ", ""),
+        ("http://Example.COM/Path/", "https://example.com/Path"),
+        ("https://www.example.com", "https://example.com"),
+        ("https://example.com:443/a", "https://example.com/a"),
+        ("http://example.com:80/a", "https://example.com/a"),
+        ("https://example.com:8080/a", "https://example.com:8080/a"),
+        ("https://example.com:port/a", "https://example.com/a"),
+        ("https://example.com/a#section", "https://example.com/a"),
+        ("https://example.com/a?utm_source=x&id=1&fbclid=y&UTM_Medium=z", "https://example.com/a?id=1"),
+        ("https://example.com/a?q=two+words&empty=", "https://example.com/a?q=two+words&empty="),
+        ("  https://example.com/a  ", "https://example.com/a"),
+    ],
+)
+def test_normalize_url(url, expected):
+    """Different URLs of the same page are normalized to the same URL."""
+    assert normalize_url(url) == expected
@@ -0,0 +1,124 @@
+"""Tests of the memo book watcher."""
+
+import os
+
+import pytest
+
+from watcher import (
+    IN_CLOSE_WRITE,
+    IN_DELETE,
+    IN_DELETE_SELF,
+    IN_MOVED_FROM,
+    IN_MOVED_TO,
+    IN_Q_OVERFLOW,
+    INOTIFY_EVENT,
+    MEMO_CREATED,
+    MEMO_DELETED,
+    MEMO_MODIFIED,
+    MEMO_MOVED,
+    MEMO_RESCAN,
+    MemoBookWatcher,
+)
+
+
+def make_event(mask: int, name: str = "", cookie: int = 0) -> bytes:
+    """Make a raw inotify event, the name is padded with zero bytes like the kernel does."""
+    raw_name = os.fsencode(name)
+    raw_name += b"\0" * (16 - len(raw_name) % 16) if raw_name else b""
+    return INOTIFY_EVENT.pack(1, mask, cookie, len(raw_name)) + raw_name
+
+
+@pytest.fixture()
+def watcher(tmp_path):
+    """Create a watcher of the memo files, not started."""
+    return MemoBookWatcher(tmp_path, ".md", on_changes=lambda changes: None)
+
+
+def test_diff_snapshots():
+    """A deleted and a created file with the same stat are a move, the other differences are reported as is."""
+    old = {"kept": (1, 10), "modified": (1, 10), "deleted": (2, 20), "moved": (3, 30)}
+    new = {"kept": (1, 10), "modified": (2, 10), "created": (4, 40), "renamed": (3, 30)}
+    assert sorted(MemoBookWatcher._diff_snapshots(old, new)) == sorted(
+        [
+            (MEMO_MODIFIED, "modified", None),
+            (MEMO_CREATED, "created", None),
+            (MEMO_MOVED, "moved", "renamed"),
+            (MEMO_DELETED, "deleted", None),
+        ]
+    )
+
+
+def test_diff_snapshots_without_changes():
+    """Equal snapshots have no changes."""
+    assert MemoBookWatcher._diff_snapshots({"a": (1, 1)}, {"a": (1, 1)}) == []
+
+
+def test_parse_inotify_events(watcher):
+    """The events of the memo files are parsed into changes, the other files are ignored."""
+    data = b"".join(
+        [
+            make_event(IN_CLOSE_WRITE, "written.md"),
+            make_event(IN_CLOSE_WRITE, "image.png"),
+            make_event(IN_CLOSE_WRITE, ".hidden.md"),
+            make_event(IN_DELETE, "deleted.md"),
+            make_event(IN_MOVED_FROM, "old.md", cookie=1),
+            make_event(IN_MOVED_TO, "new.md", cookie=1),
+            make_event(IN_MOVED_FROM, "note.md", cookie=2),
+            make_event(IN_MOVED_TO, "note.txt", cookie=2),
+            make_event(IN_MOVED_FROM, "draft.txt", cookie=3),
+            make_event(IN_MOVED_TO, "draft.md", cookie=3),
+            make_event(IN_MOVED_FROM, "gone.md", cookie=4),
+        ]
+    )
+    changes, rest, is_gone = watcher._parse_inotify_events(data)
+    assert changes == [
+        (MEMO_MODIFIED, "written", None),
+        (MEMO_DELETED, "deleted", None),
+        (MEMO_MOVED, "old", "new"),
+        (MEMO_DELETED, "note", None),
+        (MEMO_CREATED, "draft", None),
+        (MEMO_DELETED, "gone", None),
+    ]
+    assert rest == b""
+    assert not is_gone
+
+
+def test_parse_inotify_events_partial(watcher):
+    """An incomplete event is left for the next read."""
+    event = make_event(IN_CLOSE_WRITE, "second.md")
+    for cut in (INOTIFY_EVENT.size - 1, len(event) - 1):
+        data = make_event(IN_CLOSE_WRITE, "first.md") + event[:cut]
+        changes, rest, _is_gone = watcher._parse_inotify_events(data)
+        assert changes == [(MEMO_MODIFIED, "first", None)]
+        assert rest == event[:cut]
+        changes, rest, _is_gone = watcher._parse_inotify_events(rest + event[cut:])
+        assert changes == [(MEMO_MODIFIED, "second", None)]
+        assert rest == b""
+
+
+def test_parse_inotify_events_directory_gone(watcher):
+    """The watched directory itself is deleted."""
+    _changes, _rest, is_gone = watcher._parse_inotify_events(make_event(IN_DELETE_SELF))
+    assert is_gone
+
+
+def test_parse_inotify_events_overflow(watcher):
+    """Lost events are reported as a rescan, the events after them are parsed."""
+    data = make_event(IN_Q_OVERFLOW) + make_event(IN_CLOSE_WRITE, "written.md")
+    changes, _rest, is_gone = watcher._parse_inotify_events(data)
+    assert changes == [(MEMO_RESCAN, None, None), (MEMO_MODIFIED, "written", None)]
+    assert not is_gone
+
+
+def test_report_survives_callback_errors(tmp_path):
+    """An error of the callback is logged, the next changes are reported."""
+    reported = []
+
+    def on_changes(changes):
+        reported.append(changes)
+        raise OSError("the memo book is gone")
+
+    watcher = MemoBookWatcher(tmp_path, ".md", on_changes=on_changes)
+    watcher._report([(MEMO_DELETED, "a", None)])
+    watcher._report([(MEMO_DELETED, "b", None)])
+    assert len(reported) == 2